@@ -17,6 +17,7 @@ a = Analysis(
     datas=pydantic_datas,
     hiddenimports=[
         *pydantic_hiddenimports,
+        'gstack.cli',
         'typer',
         'rich',
         'click',
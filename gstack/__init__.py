@@ -1,3 +1,20 @@
 """gstack - A CLI tool for managing stacked Git branches."""
 
 __version__ = "0.1.0"
+
+# Submodules resolved on first attribute access (``gstack.git_ops``) rather
+# than at package import, so ``import gstack`` stays free of pydantic & co.
+_LAZY_SUBMODULES = frozenset(
+    {"cli", "exceptions", "gh_ops", "git_ops", "models", "stack_manager", "workflow_engine"}
+)
+
+
+def __getattr__(name: str):
+    """Import a gstack submodule lazily (PEP 562)."""
+    if name in _LAZY_SUBMODULES:
+        import importlib
+
+        module = importlib.import_module(f"{__name__}.{name}")
+        globals()[name] = module
+        return module
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
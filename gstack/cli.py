@@ -0,0 +1,474 @@
+"""Typer application and command implementations for gstack.
+
+This module is only imported by gstack.main once argv names a gstack command,
+so git pass-through never pays for importing typer. Commands import
+stack_manager/workflow_engine (and with them pydantic) on first use, so
+``--help`` and ``--version`` stay cheap as well.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional
+
+import typer
+
+from gstack import __version__, git_ops
+from gstack.exceptions import (
+    DirtyWorkdirError,
+    GhNotAuthenticatedError,
+    GitError,
+    NoPendingOperationError,
+    NotAGitRepoError,
+    NotInitializedError,
+    PendingOperationError,
+)
+
+if TYPE_CHECKING:
+    from gstack.models import StackConfig
+
+
+def version_callback(value: bool) -> None:
+    """Print version and exit."""
+    if value:
+        typer.echo(f"gstack version {__version__}")
+        raise typer.Exit()
+
+
+def main_callback(
+    version: bool = typer.Option(
+        False,
+        "--version",
+        "-V",
+        callback=version_callback,
+        is_eager=True,
+        help="Show version and exit.",
+    ),
+) -> None:
+    """gstack - Manage stacked Git branches."""
+    pass
+
+
+def get_repo_root_or_exit() -> Path:
+    """Get the repository root, or exit with error if not in a git repo."""
+    try:
+        return git_ops.get_repo_root()
+    except NotAGitRepoError:
+        typer.echo("Error: Not a git repository.", err=True)
+        raise typer.Exit(1)
+
+
+def get_initialized_repo_root_or_exit() -> Path:
+    """Get the repository root, or exit with error if gstack isn't initialized there.
+
+    Only checks that the config file exists; use get_config_or_exit() when the
+    command also needs the config.
+    """
+    from gstack import stack_manager
+
+    repo_root = get_repo_root_or_exit()
+
+    try:
+        stack_manager.require_initialized(repo_root)
+    except NotInitializedError:
+        typer.echo("Error: gstack is not initialized. Run 'gstack init' first.", err=True)
+        raise typer.Exit(1)
+
+    return repo_root
+
+
+def get_config_or_exit() -> tuple[Path, StackConfig]:
+    """Get the repository root and loaded config, or exit with error.
+
+    The config file is read once, doubling as the "is gstack initialized?" check.
+    """
+    from gstack import stack_manager
+
+    repo_root = get_repo_root_or_exit()
+
+    try:
+        config = stack_manager.load_initialized_config(repo_root)
+    except NotInitializedError:
+        typer.echo("Error: gstack is not initialized. Run 'gstack init' first.", err=True)
+        raise typer.Exit(1)
+
+    return repo_root, config
+
+
+def get_cli_context_or_exit() -> tuple[Path, StackConfig, str]:
+    """Get the repository root, loaded config and current branch, or exit with error."""
+    repo_root, config = get_config_or_exit()
+    return repo_root, config, git_ops.get_current_branch()
+
+
+def init(
+    trunk: Optional[str] = typer.Option(
+        None, "--trunk", "-t", help="Trunk branch name (auto-detected if not specified)"
+    ),
+    force: bool = typer.Option(
+        False, "--force", "-f", help="Force reinitialization if already initialized"
+    ),
+) -> None:
+    """Initialize gstack in the current repository."""
+    from gstack import stack_manager
+    from gstack.stack_manager import AlreadyInitializedError
+
+    repo_root = get_repo_root_or_exit()
+
+    try:
+        config = stack_manager.init_config(repo_root, trunk=trunk, force=force)
+        typer.echo(f"Initialized gstack with trunk branch '{config.trunk}'.")
+    except AlreadyInitializedError:
+        typer.echo("Error: gstack is already initialized. Use --force to reinitialize.", err=True)
+        raise typer.Exit(1)
+    except GitError as e:
+        typer.echo(f"Error: {e}", err=True)
+        raise typer.Exit(1)
+
+
+def create(
+    name: str = typer.Argument(..., help="Name of the new branch"),
+    parent: Optional[str] = typer.Option(
+        None, "--parent", "-p", help="Parent branch (defaults to current branch)"
+    ),
+) -> None:
+    """Create a new stacked branch."""
+    from gstack import stack_manager
+
+    repo_root, config = get_config_or_exit()
+
+    # Check if branch already exists
+    if git_ops.branch_exists(name):
+        typer.echo(f"Error: Branch '{name}' already exists.", err=True)
+        raise typer.Exit(1)
+
+    # Determine parent branch
+    if parent is None:
+        parent = git_ops.get_current_branch()
+
+    # Create the git branch
+    try:
+        git_ops.checkout_branch(name, create=True)
+    except GitError as e:
+        typer.echo(f"Error creating branch: {e}", err=True)
+        raise typer.Exit(1)
+
+    # Register in config
+    stack_manager.register_branch(name, parent=parent, repo_root=repo_root, config=config)
+
+    typer.echo(f"Created branch '{name}' on top of '{parent}'.")
+
+
+def sync() -> None:
+    """Rebase the current stack onto the latest trunk."""
+    from gstack import stack_manager, workflow_engine
+
+    repo_root, config = get_config_or_exit()
+
+    # Check for merged branches before syncing
+    try:
+        merged_branches = workflow_engine.get_merged_branches(repo_root, config=config)
+        if merged_branches:
+            typer.echo("The following branches have been merged:")
+            for branch in merged_branches:
+                typer.echo(f"  - {branch}")
+            typer.echo()
+
+            # Prompt for each merged branch
+            current = git_ops.get_current_branch()
+            to_delete = []
+            for branch in merged_branches:
+                if typer.confirm(f"Delete merged branch '{branch}'?", default=True):
+                    if current == branch:
+                        typer.echo(f"  Skipping '{branch}' (currently checked out)")
+                        continue
+                    stack_manager.unregister_branch(branch, repo_root=repo_root, config=config)
+                    to_delete.append(branch)
+
+            # Delete the confirmed branches with a single git call
+            deleted_branches = git_ops.delete_branches(to_delete, force=True)
+            for branch in to_delete:
+                if branch in deleted_branches:
+                    typer.echo(f"  Deleted '{branch}'")
+                else:
+                    typer.echo(f"  Removed '{branch}' from tracking (git branch may remain)")
+
+            if deleted_branches:
+                typer.echo()
+    except Exception:
+        # If gh is not available or not authenticated, skip merged branch detection
+        pass
+
+    try:
+        result = workflow_engine.run_sync(repo_root, config=config)
+    except DirtyWorkdirError:
+        typer.echo(
+            "Error: Working directory is not clean. Commit or stash your changes first.",
+            err=True,
+        )
+        raise typer.Exit(1)
+    except PendingOperationError:
+        typer.echo(
+            "Error: A sync operation is already in progress. "
+            "Run 'gstack continue' or 'gstack abort'.",
+            err=True,
+        )
+        raise typer.Exit(1)
+
+    if result.success:
+        if result.rebased_branches:
+            typer.echo(f"Synced {len(result.rebased_branches)} branch(es):")
+            for branch in result.rebased_branches:
+                typer.echo(f"  - {branch}")
+        else:
+            typer.echo("Nothing to sync.")
+    else:
+        typer.echo(f"Conflict in branch '{result.conflict_branch}'.", err=True)
+        typer.echo("Resolve the conflicts, stage the files, then run 'gstack continue'.")
+        typer.echo("Or run 'gstack abort' to cancel the sync.")
+        raise typer.Exit(1)
+
+
+def continue_() -> None:
+    """Continue a sync after resolving conflicts."""
+    from gstack import workflow_engine
+
+    repo_root = get_initialized_repo_root_or_exit()
+
+    try:
+        result = workflow_engine.run_continue(repo_root)
+    except NoPendingOperationError:
+        typer.echo("Error: No pending operation to continue.", err=True)
+        raise typer.Exit(1)
+
+    if result.success:
+        if result.rebased_branches:
+            typer.echo(f"Synced {len(result.rebased_branches)} branch(es):")
+            for branch in result.rebased_branches:
+                typer.echo(f"  - {branch}")
+        typer.echo("Sync complete.")
+    else:
+        typer.echo(f"Conflict in branch '{result.conflict_branch}'.", err=True)
+        typer.echo("Resolve the conflicts, stage the files, then run 'gstack continue'.")
+        raise typer.Exit(1)
+
+
+def abort() -> None:
+    """Abort the current sync operation."""
+    from gstack import workflow_engine
+
+    repo_root = get_initialized_repo_root_or_exit()
+
+    try:
+        workflow_engine.run_abort(repo_root)
+        typer.echo("Sync aborted.")
+    except NoPendingOperationError:
+        typer.echo("Error: No pending operation to abort.", err=True)
+        raise typer.Exit(1)
+
+
+def submit() -> None:
+    """Push branches and create/update GitHub PRs."""
+    from gstack import workflow_engine
+
+    repo_root = get_initialized_repo_root_or_exit()
+
+    try:
+        result = workflow_engine.run_submit(repo_root)
+    except DirtyWorkdirError:
+        typer.echo(
+            "Error: Working directory is not clean. Commit or stash your changes first.",
+            err=True,
+        )
+        raise typer.Exit(1)
+    except GhNotAuthenticatedError:
+        typer.echo(
+            "Error: Not authenticated with GitHub. Run 'gh auth login' first.",
+            err=True,
+        )
+        raise typer.Exit(1)
+
+    if result.success:
+        if result.pushed_branches:
+            typer.echo(f"Pushed {len(result.pushed_branches)} branch(es):")
+            for branch in result.pushed_branches:
+                typer.echo(f"  - {branch}")
+            if result.created_prs:
+                typer.echo(f"Created {len(result.created_prs)} PR(s):")
+                for branch in result.created_prs:
+                    typer.echo(f"  - {branch}")
+            if result.updated_prs:
+                typer.echo(f"Updated base for {len(result.updated_prs)} PR(s):")
+                for branch in result.updated_prs:
+                    typer.echo(f"  - {branch}")
+        else:
+            typer.echo("Nothing to submit.")
+    else:
+        typer.echo(f"Error: {result.message}", err=True)
+        raise typer.Exit(1)
+
+
+def push() -> None:
+    """Push the current branch and create/update its PR."""
+    from gstack import workflow_engine
+
+    repo_root = get_initialized_repo_root_or_exit()
+
+    try:
+        result = workflow_engine.run_push(repo_root)
+    except DirtyWorkdirError:
+        typer.echo(
+            "Error: Working directory is not clean. Commit or stash your changes first.",
+            err=True,
+        )
+        raise typer.Exit(1)
+    except GhNotAuthenticatedError:
+        typer.echo(
+            "Error: Not authenticated with GitHub. Run 'gh auth login' first.",
+            err=True,
+        )
+        raise typer.Exit(1)
+
+    if result.success:
+        typer.echo(result.message)
+    else:
+        typer.echo(f"Error: {result.message}", err=True)
+        raise typer.Exit(1)
+
+
+def log() -> None:
+    """Show the current stack structure."""
+    _, config, current_branch = get_cli_context_or_exit()
+
+    if not config.branches:
+        typer.echo(f"No stacked branches. Trunk: {config.trunk}")
+        return
+
+    # Print trunk
+    lines = [f"Trunk: {config.trunk}"]
+
+    # Walk the tree depth-first from the root branches with an explicit stack
+    # (children pushed in reverse so they are printed in order) and emit the
+    # output in one write
+    branches = config.branches
+    stack = [(branch, 1) for branch in reversed(config.root_branches())]
+    while stack:
+        branch, indent = stack.pop()
+        info = branches.get(branch)
+        if info is None:
+            # Stale child entry for a branch that is no longer tracked
+            continue
+        marker = "* " if branch == current_branch else "  "
+        pr_info = f" ({info.pr_url})" if info.pr_url else ""
+        lines.append(f"{'  ' * indent}{marker}{branch}{pr_info}")
+
+        stack.extend((child, indent + 1) for child in reversed(info.children))
+
+    typer.echo("\n".join(lines))
+
+
+def move(
+    branch: str = typer.Argument(..., help="Branch to move"),
+    onto: str = typer.Option(..., "--onto", "-o", help="New parent branch"),
+) -> None:
+    """Move a branch to a new parent in the stack."""
+    from gstack import workflow_engine
+
+    repo_root = get_initialized_repo_root_or_exit()
+
+    result = workflow_engine.run_move(repo_root, branch, onto)
+
+    if result.success:
+        typer.echo(result.message)
+        if result.pr_updated:
+            typer.echo(f"  Updated PR base to '{result.new_parent}'.")
+    else:
+        typer.echo(f"Error: {result.message}", err=True)
+        raise typer.Exit(1)
+
+
+def delete(
+    name: str = typer.Argument(..., help="Name of the branch to delete"),
+    force: bool = typer.Option(
+        False, "--force", "-f", help="Force delete even if branch has unmerged changes"
+    ),
+) -> None:
+    """Delete a branch from the stack."""
+    from gstack import stack_manager
+
+    repo_root, config, current_branch = get_cli_context_or_exit()
+
+    # Check if branch is tracked
+    if name not in config.branches:
+        typer.echo(f"Error: Branch '{name}' is not tracked by gstack.", err=True)
+        raise typer.Exit(1)
+
+    # Check if we're on the branch to delete
+    if current_branch == name:
+        typer.echo(
+            "Error: Cannot delete the current branch. Checkout a different branch first.",
+            err=True,
+        )
+        raise typer.Exit(1)
+
+    # Unregister from config (handles reparenting)
+    stack_manager.unregister_branch(name, repo_root=repo_root, config=config)
+
+    # Delete the git branch
+    try:
+        git_ops.delete_branch(name, force=force)
+        typer.echo(f"Deleted branch '{name}'.")
+    except GitError as e:
+        # Branch might already be deleted in git, that's ok
+        if "not found" not in str(e).lower():
+            typer.echo(f"Warning: Could not delete git branch: {e}", err=True)
+        else:
+            typer.echo(f"Removed '{name}' from gstack (git branch already deleted).")
+
+
+# Command name -> implementation, in the order shown by --help
+COMMANDS = {
+    "init": init,
+    "create": create,
+    "sync": sync,
+    "continue": continue_,
+    "abort": abort,
+    "submit": submit,
+    "push": push,
+    "log": log,
+    "move": move,
+    "delete": delete,
+}
+
+
+def build_app(command: Optional[str] = None) -> typer.Typer:
+    """Build the typer application.
+
+    Click builds parser state for every registered command when the app is
+    invoked, so when the command being run is known only that one is
+    registered. The version callback keeps the app in group mode, so
+    ``gstack <command> ...`` parses the same either way.
+
+    Args:
+        command: The command about to run. If None or not a gstack command
+            (e.g. --help), all commands are registered.
+
+    Returns:
+        The typer application.
+    """
+    app = typer.Typer(
+        name="gstack",
+        help="Manage stacked Git branches with automated rebasing and GitHub PR management.",
+        no_args_is_help=True,
+    )
+    app.callback()(main_callback)
+
+    names = [command] if command in COMMANDS else list(COMMANDS)
+    for name in names:
+        app.command(name=name)(COMMANDS[name])
+
+    return app
+
+
+# Full application with every command registered
+app = build_app()
@@ -6,12 +6,21 @@ All gh commands are executed via subprocess, capturing output for error handling
 from __future__ import annotations
 
 import json
+import shutil
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from typing import Optional
 
 from gstack.exceptions import GhError, GhNotAuthenticatedError
 
+try:
+    # orjson.JSONDecodeError subclasses json.JSONDecodeError, so existing
+    # except clauses keep working with either parser.
+    from orjson import loads as json_loads
+except ImportError:  # pragma: no cover - orjson is optional
+    from json import loads as json_loads
+
 
 @dataclass
 class GhResult:
@@ -40,6 +49,21 @@ class PrCreateResult:
     number: int
 
 
+_gh_installed: Optional[bool] = None
+
+
+def is_gh_installed() -> bool:
+    """Check whether the gh binary is on PATH (looked up once per process).
+
+    Returns:
+        True if gh can be found, False otherwise.
+    """
+    global _gh_installed
+    if _gh_installed is None:
+        _gh_installed = shutil.which("gh") is not None
+    return _gh_installed
+
+
 def run_gh(*args: str, check: bool = True) -> GhResult:
     """Run a gh command and return the result.
 
@@ -75,14 +99,42 @@ def run_gh(*args: str, check: bool = True) -> GhResult:
     return gh_result
 
 
+def run_gh_returncode(*args: str) -> int:
+    """Run a gh command and return only its exit code.
+
+    Output is discarded instead of captured, so no pipes are created and
+    nothing is decoded. Use this for yes/no queries.
+
+    Args:
+        *args: gh command arguments.
+
+    Returns:
+        The command's exit code.
+    """
+    result = subprocess.run(
+        ["gh", *args],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    return result.returncode
+
+
+_gh_authenticated = False
+
+
 def is_gh_authenticated() -> bool:
     """Check if the GitHub CLI is authenticated.
 
+    A successful check is remembered for the rest of the process; a failed
+    one is retried, since the user may log in meanwhile.
+
     Returns:
         True if authenticated, False otherwise.
     """
-    result = run_gh("auth", "status", check=False)
-    return result.returncode == 0
+    global _gh_authenticated
+    if not _gh_authenticated:
+        _gh_authenticated = run_gh_returncode("auth", "status") == 0
+    return _gh_authenticated
 
 
 def require_gh_auth() -> None:
@@ -117,7 +169,7 @@ def get_pr_info(branch: str) -> Optional[PrInfo]:
         return None
 
     try:
-        data = json.loads(result.stdout)
+        data = json_loads(result.stdout)
         return PrInfo(
             url=data["url"],
             base=data["baseRefName"],
@@ -128,6 +180,129 @@ def get_pr_info(branch: str) -> Optional[PrInfo]:
         return None
 
 
+def get_pr_infos(branches: list[str], max_workers: int = 8) -> dict[str, Optional[PrInfo]]:
+    """Get pull request information for several branches concurrently.
+
+    Each lookup is an independent, network-bound ``gh pr view`` call, so they
+    are dispatched on a thread pool instead of one after another.
+
+    Args:
+        branches: Branch names to look up.
+        max_workers: Maximum number of concurrent gh processes.
+
+    Returns:
+        Dict of branch name -> PrInfo (or None if the branch has no PR).
+    """
+    if not branches:
+        return {}
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(branches))) as executor:
+        return dict(zip(branches, executor.map(get_pr_info, branches)))
+
+
+_PR_INFO_FIELDS = "url baseRefName state number"
+
+
+# How many of a branch's most recent PRs to consider when picking the one
+# gh pr view would show
+_PR_LOOKUP_CANDIDATES = 10
+
+
+def _pr_lookup_args(branches: list[str], fields: str) -> list[str]:
+    """Build ``gh api graphql`` arguments looking up the PRs of each branch.
+
+    The result has one aliased ``pullRequests`` lookup per branch, ``b0``,
+    ``b1``, ... in the order of ``branches``, each returning the newest few
+    PRs with their state and head repository owner, plus the repository's
+    own owner. Use _select_pr() to pick a branch's PR from the response.
+
+    Args:
+        branches: Branch names to look up.
+        fields: GraphQL selection for each pull request node.
+
+    Returns:
+        Arguments for run_gh.
+    """
+    variables = ", ".join(f"$h{i}: String!" for i in range(len(branches)))
+    lookups = " ".join(
+        f"b{i}: pullRequests(headRefName: $h{i}, first: {_PR_LOOKUP_CANDIDATES}, "
+        f"orderBy: {{field: CREATED_AT, direction: DESC}}) "
+        f"{{ nodes {{ state headRepositoryOwner {{ login }} {fields} }} }}"
+        for i in range(len(branches))
+    )
+    query = (
+        f"query($owner: String!, $repo: String!, {variables}) "
+        f"{{ repository(owner: $owner, name: $repo) {{ owner {{ login }} {lookups} }} }}"
+    )
+
+    args = ["api", "graphql", "-f", f"query={query}", "-F", "owner={owner}", "-F", "repo={repo}"]
+    for i, branch in enumerate(branches):
+        args.extend(["-f", f"h{i}={branch}"])
+    return args
+
+
+def _select_pr(repository: dict, index: int) -> Optional[dict]:
+    """Pick a branch's PR from a _pr_lookup_args() response as gh pr view would.
+
+    PRs opened from forks that happen to use the same branch name are
+    ignored. Of the rest, an open PR wins over the newest closed or merged one.
+
+    Args:
+        repository: The ``data.repository`` object of the response.
+        index: Position of the branch in the looked-up branches.
+
+    Returns:
+        The pull request node, or None if the branch has no PR.
+    """
+    owner = repository["owner"]["login"].lower()
+    nodes = [
+        node
+        for node in repository[f"b{index}"]["nodes"]
+        if (node["headRepositoryOwner"] or {}).get("login", "").lower() == owner
+    ]
+    for node in nodes:
+        if node["state"] == "OPEN":
+            return node
+    return nodes[0] if nodes else None
+
+
+def get_all_pr_infos(branches: list[str]) -> dict[str, PrInfo]:
+    """Get pull request information for several branches with one gh call.
+
+    Issues a single GraphQL query with one aliased ``pullRequests`` lookup per
+    branch, instead of one ``gh pr view`` process and HTTP request per branch.
+
+    Args:
+        branches: Branch names to look up.
+
+    Returns:
+        Dict of branch name -> PrInfo for branches that have a PR. Branches
+        without a PR (or if the query fails) are omitted.
+    """
+    if not branches:
+        return {}
+
+    result = run_gh(*_pr_lookup_args(branches, _PR_INFO_FIELDS), check=False)
+    if result.returncode != 0:
+        return {}
+
+    try:
+        repository = json_loads(result.stdout)["data"]["repository"]
+        infos = {}
+        for i, branch in enumerate(branches):
+            data = _select_pr(repository, i)
+            if data is not None:
+                infos[branch] = PrInfo(
+                    url=data["url"],
+                    base=data["baseRefName"],
+                    state=data["state"],
+                    number=data["number"],
+                )
+        return infos
+    except (json.JSONDecodeError, KeyError, TypeError):
+        return {}
+
+
 def create_pr(
     head: str,
     base: str,
@@ -174,8 +349,8 @@ def create_pr(
 
     # Extract PR number from URL (e.g., https://github.com/org/repo/pull/42)
     try:
-        number = int(url.split("/")[-1])
-    except (ValueError, IndexError):
+        number = int(url.rpartition("/")[2])
+    except ValueError:
         number = 0
 
     return PrCreateResult(
@@ -206,15 +381,41 @@ def is_pr_merged(branch: str) -> bool:
     Returns:
         True if PR exists and is merged, False otherwise.
     """
-    info = get_pr_info(branch)
-    if info is None:
-        return False
-    return info.state == "MERGED"
+    # Only the state is needed, so let gh select it and print it bare.
+    result = run_gh("pr", "view", branch, "--json", "state", "--jq", ".state", check=False)
+    return result.returncode == 0 and result.stdout.strip() == "MERGED"
 
 
 STACK_COMMENT_MARKER = "<!-- gstack-diagram -->"
 
 
+def _find_stack_comment_id(branch: str) -> Optional[str]:
+    """Find the id of the gstack comment on a branch's PR.
+
+    The filtering runs in gh's built-in jq, so only matching ids are printed
+    instead of the full comments payload. gh pages through all comments.
+
+    Args:
+        branch: Branch name with the PR.
+
+    Returns:
+        The comment's GraphQL node id, or None if the PR has no gstack comment.
+
+    Raises:
+        GhError: If there is no PR for the branch or the lookup fails.
+    """
+    result = run_gh(
+        "pr",
+        "view",
+        branch,
+        "--json",
+        "comments",
+        "--jq",
+        f'.comments[] | select(.body | contains("{STACK_COMMENT_MARKER}")) | .id',
+    )
+    return next(iter(result.stdout.split()), None)
+
+
 def add_or_update_stack_comment(branch: str, comment_body: str) -> None:
     """Add or update a stack diagram comment on a PR.
 
@@ -228,49 +429,162 @@ def add_or_update_stack_comment(branch: str, comment_body: str) -> None:
     Raises:
         GhError: If comment operation fails.
     """
-    pr_info = get_pr_info(branch)
-    if pr_info is None:
+    try:
+        comment_id = _find_stack_comment_id(branch)
+    except GhError:
+        # No PR for this branch
+        return
+
+    if comment_id:
+        # The id is a GraphQL node id (IC_...), which the REST comments
+        # endpoint doesn't accept, so update it through GraphQL
+        _run_comment_mutations([(None, comment_id)], comment_body)
         return
 
-    # Get existing comments to find our marker
+    # No existing comment found, create new one
+    run_gh("pr", "comment", branch, "--body", comment_body, check=False)
+
+
+def _run_comment_mutations(
+    targets: list[tuple[Optional[str], Optional[str]]], comment_body: str
+) -> set[int]:
+    """Add or update comments with one GraphQL mutation.
+
+    Each target becomes an aliased field (``c0``, ``c1``, ...) of a single
+    mutation. GraphQL resolves the fields independently, so when some of them
+    fail the others are still applied; the partial ``data`` in the response
+    tells which ones went through.
+
+    Args:
+        targets: (pr_node_id, comment_node_id) pairs. The comment is updated
+            when its id is given, otherwise a new one is added to the PR.
+        comment_body: The comment body.
+
+    Returns:
+        Indices into targets whose comment was written.
+    """
+    variables = ["$body: String!"]
+    mutations = []
+    args = []
+    for i, (pr_id, comment_id) in enumerate(targets):
+        variables.append(f"$n{i}: ID!")
+        if comment_id:
+            mutations.append(
+                f"c{i}: updateIssueComment(input: {{id: $n{i}, body: $body}}) "
+                f"{{ clientMutationId }}"
+            )
+            args.extend(["-f", f"n{i}={comment_id}"])
+        else:
+            mutations.append(
+                f"c{i}: addComment(input: {{subjectId: $n{i}, body: $body}}) {{ clientMutationId }}"
+            )
+            args.extend(["-f", f"n{i}={pr_id}"])
+
+    mutation = f"mutation({', '.join(variables)}) {{ {' '.join(mutations)} }}"
     result = run_gh(
-        "pr",
-        "view",
-        branch,
-        "--json",
-        "comments",
+        "api",
+        "graphql",
+        "-f",
+        f"query={mutation}",
+        "-f",
+        f"body={comment_body}",
+        *args,
         check=False,
     )
-
     if result.returncode == 0:
-        try:
-            data = json.loads(result.stdout)
-            comments = data.get("comments", [])
-
-            # Look for existing gstack comment
-            for comment in comments:
-                if STACK_COMMENT_MARKER in comment.get("body", ""):
-                    # Update existing comment
-                    comment_id = comment.get("id")
-                    if comment_id:
-                        # gh doesn't have a direct way to edit PR comments,
-                        # so we delete and recreate
-                        # Actually, we can use the API directly
-                        run_gh(
-                            "api",
-                            "-X",
-                            "PATCH",
-                            f"/repos/{{owner}}/{{repo}}/issues/comments/{comment_id}",
-                            "-f",
-                            f"body={comment_body}",
-                            check=False,
-                        )
-                        return
-        except (json.JSONDecodeError, KeyError):
-            pass
+        return set(range(len(targets)))
+
+    # gh still prints the response body when some fields failed
+    try:
+        data = json_loads(result.stdout).get("data") or {}
+    except (json.JSONDecodeError, AttributeError):
+        return set()
+    return {i for i in range(len(targets)) if data.get(f"c{i}") is not None}
 
-    # No existing comment found, create new one
-    run_gh("pr", "comment", branch, "--body", comment_body, check=False)
+
+def add_or_update_stack_comments(branches: list[str], comment_body: str) -> list[str]:
+    """Add or update the stack diagram comment on several PRs with two gh calls.
+
+    One GraphQL query finds each branch's PR and any existing gstack comment,
+    then one mutation updates those comments and adds the missing ones. This
+    replaces two ``gh`` processes per PR with two in total. Only the first 100
+    comments come back with the query, so a PR with more whose first page
+    lacks the gstack comment is searched with ``gh pr view``. Branches without
+    a PR are skipped, and PRs whose part of the mutation failed are retried
+    one at a time.
+
+    Args:
+        branches: Branch names whose PRs should get the comment.
+        comment_body: The comment body (should include STACK_COMMENT_MARKER).
+
+    Returns:
+        The branches whose PR now has the comment (empty if the lookup failed).
+    """
+    if not branches:
+        return []
+
+    result = run_gh(
+        *_pr_lookup_args(
+            branches, "id comments(first: 100) { nodes { id body } pageInfo { hasNextPage } }"
+        ),
+        check=False,
+    )
+    if result.returncode != 0:
+        return []
+
+    try:
+        repository = json_loads(result.stdout)["data"]["repository"]
+        posted = []
+        targets = []
+        for i, branch in enumerate(branches):
+            pr = _select_pr(repository, i)
+            if pr is None:
+                continue
+            existing = next(
+                (c["id"] for c in pr["comments"]["nodes"] if STACK_COMMENT_MARKER in c["body"]),
+                None,
+            )
+            if existing is None and pr["comments"]["pageInfo"]["hasNextPage"]:
+                # The comment may be past the first page; let gh page through
+                try:
+                    existing = _find_stack_comment_id(branch)
+                except GhError:
+                    continue
+            posted.append(branch)
+            targets.append((pr["id"], existing))
+    except (json.JSONDecodeError, KeyError, TypeError):
+        return []
+
+    if not targets:
+        return []
+
+    written = _run_comment_mutations(targets, comment_body)
+
+    # Retry the PRs that failed on their own, so one rejected field doesn't
+    # cost the others a second write
+    for i in sorted(set(range(len(targets))) - written):
+        if _run_comment_mutations([targets[i]], comment_body):
+            written.add(i)
+
+    return [branch for i, branch in enumerate(posted) if i in written]
+
+
+# Mermaid line templates for generate_stack_mermaid. PR nodes use a quoted
+# label to avoid mermaid parsing issues with brackets:
+#   Valid: name["name #42"]
+#   Invalid: name[name [#42]] - nested brackets break mermaid
+# and the click directive for clickable links (not HTML <a> tags).
+_MERMAID_HEADER = (
+    STACK_COMMENT_MARKER + "\n## Stack Overview\n\n```mermaid\ngraph TD\n    {trunk}[{trunk}]\n"
+)
+_MERMAID_NODE = "    {name}[{name}]\n    {parent} --> {name}\n"
+_MERMAID_NODE_WITH_PR = (
+    '    {name}["{name} #{pr_num}"]\n'
+    '    click {name} href "{url}" _blank\n'
+    "    {parent} --> {name}\n"
+)
+_MERMAID_CURRENT = "    style {name} fill:#90EE90\n"
+_MERMAID_FOOTER = "```\n\n*Updated by gstack*"
 
 
 def generate_stack_mermaid(
@@ -288,39 +602,24 @@ def generate_stack_mermaid(
     Returns:
         Mermaid diagram as a string.
     """
-    lines = [
-        STACK_COMMENT_MARKER,
-        "## Stack Overview",
-        "",
-        "```mermaid",
-        "graph TD",
-        f"    {trunk}[{trunk}]",
-    ]
+    parts = [_MERMAID_HEADER.format(trunk=trunk)]
 
-    # Build the graph
+    # Build the graph: node (with PR link if available), edge from parent
     for name, info in branches.items():
-        # Node with PR link if available
-        if info.pr_url:
-            pr_num = info.pr_url.split("/")[-1]
-            # Use quoted label to avoid mermaid parsing issues with brackets
-            # Valid: name["name #42"]
-            # Invalid: name[name [#42]] - nested brackets break mermaid
-            label = f"{name} #{pr_num}"
-            lines.append(f'    {name}["{label}"]')
-            # Use mermaid click directive for clickable links (not HTML <a> tags)
-            lines.append(f'    click {name} href "{info.pr_url}" _blank')
+        url = info.pr_url
+        if url:
+            parts.append(
+                _MERMAID_NODE_WITH_PR.format(
+                    name=name, pr_num=url.rpartition("/")[2], url=url, parent=info.parent
+                )
+            )
         else:
-            lines.append(f"    {name}[{name}]")
-
-        # Edge from parent to this branch
-        lines.append(f"    {info.parent} --> {name}")
+            parts.append(_MERMAID_NODE.format(name=name, parent=info.parent))
 
         # Highlight current branch
         if name == current_branch:
-            lines.append(f"    style {name} fill:#90EE90")
+            parts.append(_MERMAID_CURRENT.format(name=name))
 
-    lines.append("```")
-    lines.append("")
-    lines.append("*Updated by gstack*")
+    parts.append(_MERMAID_FOOTER)
 
-    return "\n".join(lines)
+    return "".join(parts)
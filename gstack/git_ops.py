@@ -6,6 +6,7 @@ All git commands are executed via subprocess, capturing output for error handlin
 from __future__ import annotations
 
 import os
+import shutil
 import subprocess
 from dataclasses import dataclass
 from pathlib import Path
@@ -23,6 +24,30 @@ class GitResult:
     returncode: int
 
 
+_git_path: Optional[str] = None
+
+
+def _git_executable() -> str:
+    """Absolute path to the git binary (resolved once), or "git" if not on PATH.
+
+    Passing an absolute path together with close_fds=False lets CPython start
+    git with posix_spawn instead of fork+exec, which avoids copying the
+    parent's page tables. File descriptors opened by Python are
+    non-inheritable by default (PEP 446), so close_fds=False leaks nothing.
+    """
+    global _git_path
+    if _git_path is None:
+        _git_path = shutil.which("git") or "git"
+    return _git_path
+
+
+def _git_env() -> dict[str, str]:
+    """Environment for git subprocesses (prevents git from opening an editor)."""
+    env = os.environ.copy()
+    env["GIT_EDITOR"] = "true"
+    return env
+
+
 def run_git(*args: str, check: bool = True, cwd: Optional[Path] = None) -> GitResult:
     """Run a git command and return the result.
 
@@ -37,18 +62,15 @@ def run_git(*args: str, check: bool = True, cwd: Optional[Path] = None) -> GitRe
     Raises:
         GitError: If check=True and command fails.
     """
-    cmd = ["git", *args]
-
-    # Set environment to prevent git from opening an editor
-    env = os.environ.copy()
-    env["GIT_EDITOR"] = "true"
+    cmd = [_git_executable(), *args]
 
     result = subprocess.run(
         cmd,
         capture_output=True,
         text=True,
         cwd=cwd,
-        env=env,
+        env=_git_env(),
+        close_fds=False,
     )
 
     git_result = GitResult(
@@ -66,6 +88,45 @@ def run_git(*args: str, check: bool = True, cwd: Optional[Path] = None) -> GitRe
     return git_result
 
 
+def resolve_ref(rev: str) -> Optional[str]:
+    """Resolve a revision to an object SHA.
+
+    Args:
+        rev: Revision to resolve.
+
+    Returns:
+        The object SHA, or None if the revision does not exist.
+    """
+    result = run_git("rev-parse", "--verify", "--quiet", rev, check=False)
+    if result.returncode != 0:
+        return None
+    return result.stdout.strip()
+
+
+def run_git_returncode(*args: str, cwd: Optional[Path] = None) -> int:
+    """Run a git command and return only its exit code.
+
+    Output is discarded instead of captured, so no pipes are created and
+    nothing is decoded. Use this for yes/no queries.
+
+    Args:
+        *args: Git command arguments.
+        cwd: Working directory for the command.
+
+    Returns:
+        The command's exit code.
+    """
+    result = subprocess.run(
+        [_git_executable(), *args],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        cwd=cwd,
+        env=_git_env(),
+        close_fds=False,
+    )
+    return result.returncode
+
+
 def get_current_branch() -> str:
     """Get the name of the current branch.
 
@@ -85,8 +146,11 @@ def is_workdir_clean() -> bool:
     Returns:
         True if clean, False if there are uncommitted changes.
     """
-    result = run_git("status", "--porcelain")
-    return len(result.stdout.strip()) == 0
+    # A single status call (which refreshes stale stat info, unlike
+    # diff-index/diff-files) with rename detection disabled, since we only
+    # need to know whether anything is listed at all.
+    result = run_git("status", "--porcelain", "--no-renames")
+    return not result.stdout.strip()
 
 
 def require_clean_workdir() -> None:
@@ -140,8 +204,7 @@ def branch_exists(name: str) -> bool:
     Returns:
         True if the branch exists, False otherwise.
     """
-    result = run_git("rev-parse", "--verify", f"refs/heads/{name}", check=False)
-    return result.returncode == 0
+    return resolve_ref(f"refs/heads/{name}") is not None
 
 
 def is_ancestor(commit_a: str, commit_b: str) -> bool:
@@ -154,8 +217,25 @@ def is_ancestor(commit_a: str, commit_b: str) -> bool:
     Returns:
         True if commit_a is an ancestor of commit_b.
     """
-    result = run_git("merge-base", "--is-ancestor", commit_a, commit_b, check=False)
-    return result.returncode == 0
+    return run_git_returncode("merge-base", "--is-ancestor", commit_a, commit_b) == 0
+
+
+def count_divergence(base: str, branch: str) -> Optional[tuple[int, int]]:
+    """Count how far a branch has diverged from a base ref.
+
+    Args:
+        base: The base ref (e.g., the branch's parent).
+        branch: The branch to compare.
+
+    Returns:
+        Tuple of (behind, ahead): commits on base missing from branch, and
+        commits on branch missing from base. None if either ref is invalid.
+    """
+    result = run_git("rev-list", "--left-right", "--count", f"{base}...{branch}", check=False)
+    if result.returncode != 0:
+        return None
+    behind, ahead = result.stdout.split()
+    return int(behind), int(ahead)
 
 
 def rebase(
@@ -163,6 +243,7 @@ def rebase(
     onto: Optional[str] = None,
     upstream: Optional[str] = None,
     check: bool = True,
+    branch: Optional[str] = None,
 ) -> GitResult:
     """Rebase the current branch.
 
@@ -171,6 +252,8 @@ def rebase(
         onto: For --onto rebases, the new base.
         upstream: For --onto rebases, the upstream to replay commits from.
         check: If True, raise GitError on failure.
+        branch: Branch to switch to before rebasing, in the same git call.
+            Defaults to the current branch.
 
     Returns:
         GitResult from the rebase command.
@@ -180,10 +263,13 @@ def rebase(
     """
     if onto is not None and upstream is not None:
         # git rebase --onto <onto> <upstream>
-        return run_git("rebase", "--onto", onto, upstream, check=check)
+        args = ["rebase", "--onto", onto, upstream]
     else:
         # Simple rebase
-        return run_git("rebase", target, check=check)
+        args = ["rebase", target]
+    if branch is not None:
+        args.append(branch)
+    return run_git(*args, check=check)
 
 
 def is_rebase_in_progress() -> bool:
@@ -197,10 +283,12 @@ def is_rebase_in_progress() -> bool:
     except NotAGitRepoError:
         return False
 
-    git_dir = repo_root / ".git"
+    git_dir = os.path.join(repo_root, ".git")
 
     # Check for rebase-merge (interactive rebase) or rebase-apply (regular rebase)
-    return (git_dir / "rebase-merge").exists() or (git_dir / "rebase-apply").exists()
+    return any(
+        os.path.exists(os.path.join(git_dir, name)) for name in ("rebase-merge", "rebase-apply")
+    )
 
 
 def rebase_continue() -> GitResult:
@@ -240,6 +328,25 @@ def fetch(remote: str, branch: str) -> GitResult:
     return run_git("fetch", remote, branch)
 
 
+def fetch_many(remote: str, branches: list[str]) -> GitResult:
+    """Fetch several branches from a remote in a single git fetch.
+
+    One fetch negotiates with the remote once for all branches. This is
+    preferred over concurrent fetches, which would contend on ref locks and
+    FETCH_HEAD in the same repository.
+
+    Args:
+        remote: Remote name (e.g., 'origin').
+        branches: Branch names to fetch.
+
+    Returns:
+        GitResult from the fetch command (empty result if branches is empty).
+    """
+    if not branches:
+        return GitResult(stdout="", stderr="", returncode=0)
+    return run_git("fetch", remote, *branches)
+
+
 def push(
     remote: str,
     branch: str,
@@ -270,21 +377,122 @@ def push(
     return run_git(*args)
 
 
+def push_branches(
+    remote: str,
+    branches: list[str],
+    force_with_lease: bool = True,
+    set_upstream: bool = False,
+) -> dict[str, str]:
+    """Push several branches to a remote with a single git push.
+
+    One process and one connection to the remote, instead of one per branch.
+    git updates every ref it can and reports the others individually.
+
+    Args:
+        remote: Remote name (e.g., 'origin').
+        branches: Branch names to push.
+        force_with_lease: Use --force-with-lease for safe force push.
+        set_upstream: Set upstream tracking (-u flag) for every pushed branch.
+
+    Returns:
+        Dict of rejected branch -> git's reason, e.g. "[rejected] (non-fast-forward)"
+        (empty if all were pushed).
+
+    Raises:
+        GitError: If the push failed without a result for every branch (e.g.
+            the remote could not be reached).
+    """
+    if not branches:
+        return {}
+
+    args = ["push", "--porcelain"]
+
+    if set_upstream:
+        args.append("-u")
+
+    if force_with_lease:
+        args.append("--force-with-lease")
+
+    args.append(remote)
+    args.extend(branches)
+
+    result = run_git(*args, check=False)
+    if result.returncode == 0:
+        return {}
+
+    # Porcelain ref lines are "<flag>\t<src>:<dst>\t<summary>"; "!" means rejected
+    statuses = {}
+    for line in result.stdout.splitlines():
+        fields = line.split("\t")
+        if len(fields) == 3:
+            src = fields[1].partition(":")[0]
+            statuses[src.removeprefix("refs/heads/")] = (fields[0], fields[2])
+
+    # Without a status for every branch the failure can't be pinned on
+    # individual refs, so report git's own error instead
+    if any(branch not in statuses for branch in branches):
+        raise GitError(
+            result.stderr.strip() or f"git push to '{remote}' failed",
+            returncode=result.returncode,
+            stderr=result.stderr,
+        )
+
+    return {branch: summary for branch, (flag, summary) in statuses.items() if flag == "!"}
+
+
+# Repository root per working directory. Nothing gstack does can move the
+# repository root, so this is cached for the lifetime of the process.
+_repo_root_cache: dict[str, Path] = {}
+
+
 def get_repo_root() -> Path:
     """Get the root directory of the current git repository.
 
+    The result is cached per working directory, so repeated calls within one
+    command do not spawn git again.
+
     Returns:
         Path to the repository root.
 
     Raises:
         NotAGitRepoError: If not inside a git repository.
     """
+    cwd = os.getcwd()
+    cached = _repo_root_cache.get(cwd)
+    if cached is not None:
+        return cached
+
     result = run_git("rev-parse", "--show-toplevel", check=False)
 
     if result.returncode != 0:
         raise NotAGitRepoError()
 
-    return Path(result.stdout.strip())
+    repo_root = _repo_root_cache[cwd] = Path(result.stdout.strip())
+    return repo_root
+
+
+def get_branch_remotes() -> dict[str, str]:
+    """Get the configured remote of every local branch that has one.
+
+    Reads all ``branch.<name>.remote`` entries with a single git call instead
+    of one ``git config --get`` per branch.
+
+    Returns:
+        Dict of branch name -> remote name. Branches without an upstream
+        are omitted.
+    """
+    result = run_git("config", "-z", "--get-regexp", r"^branch\..*\.remote$", check=False)
+    if result.returncode != 0:
+        # Exit code 1 means no entries matched
+        return {}
+
+    remotes = {}
+    # Entries are "branch.<name>.remote\n<value>\0"; names may contain dots
+    for entry in result.stdout.split("\0"):
+        key, sep, value = entry.partition("\n")
+        if sep:
+            remotes[key[len("branch.") : -len(".remote")]] = value
+    return remotes
 
 
 def delete_branch(name: str, force: bool = False) -> GitResult:
@@ -304,34 +512,89 @@ def delete_branch(name: str, force: bool = False) -> GitResult:
     return run_git("branch", flag, name)
 
 
-def squash_commits(parent: str) -> GitResult:
-    """Squash all commits on the current branch since parent into one.
+def delete_branches(names: list[str], force: bool = False) -> list[str]:
+    """Delete several local branches with a single git process.
+
+    git deletes every branch it can and reports the others, so a failure for
+    one branch doesn't stop the rest.
+
+    Args:
+        names: Branch names to delete.
+        force: If True, force delete even if not fully merged.
+
+    Returns:
+        The names that were deleted (or were already gone).
+    """
+    if not names:
+        return []
+
+    flag = "-D" if force else "-d"
+    result = run_git("branch", flag, *names, check=False)
+    if result.returncode == 0:
+        return list(names)
+
+    return [name for name in names if not branch_exists(name)]
+
+
+def squash_commits(parent: str, branch: str = "HEAD") -> GitResult:
+    """Squash all commits on a branch since it forked from parent into one.
 
     This is useful before rebasing to reduce the number of potential conflicts.
-    If there's only one commit (or no commits), this is a no-op.
+    If there's only one commit (or no commits), this is a no-op. The squashed
+    commit is built with ``git commit-tree`` on top of the fork point and the
+    branch ref is moved to it, so the branch doesn't need to be checked out
+    and the working tree is never touched.
+
+    Unlike ``git commit``, this plumbing does not run the commit hooks
+    (pre-commit, commit-msg, post-commit). ``commit.gpgsign`` is honoured
+    explicitly by passing ``-S`` when it is set.
 
     Args:
         parent: The parent branch/commit to squash commits since.
+        branch: The branch to squash (defaults to the current branch).
 
     Returns:
         GitResult from the final operation (or empty result if no-op).
+
+    Raises:
+        GitError: If the oldest commit to squash is a root commit, since there
+            is no fork point to build the squashed commit on.
     """
-    # Get commit count between parent and HEAD
-    result = run_git("rev-list", "--count", f"{parent}..HEAD")
-    count = int(result.stdout.strip())
+    # Get the parents and message of every commit between parent and branch
+    # in one call. With -z each record is NUL-terminated, so the record count
+    # is the commit count. We use reverse to get commits in chronological
+    # order, and first-parent so the oldest record's parent is the fork point.
+    log_result = run_git(
+        "log", "-z", "--first-parent", "--format=%P%n%B", "--reverse", f"{parent}..{branch}"
+    )
+    records = log_result.stdout.split("\0")[:-1]
+    count = len(records)
 
     if count <= 1:
         # Nothing to squash
         return GitResult(stdout="", stderr="", returncode=0)
 
-    # Get the first commit message (the one right after parent)
-    # We use reverse to get commits in chronological order, then take the first
-    msg_result = run_git("log", "--format=%B", "--reverse", f"{parent}..HEAD")
-    messages = msg_result.stdout.strip().split("\n\n")
-    first_message = messages[0].strip() if messages else f"Squashed {count} commits"
-
-    # Soft reset to parent, keeping all changes staged
-    run_git("reset", "--soft", parent)
-
-    # Create single squashed commit with the first commit's message
-    return run_git("commit", "-m", first_message)
+    parents, first_body = records[0].split("\n", 1)
+    if not parents:
+        raise GitError(f"Cannot squash '{branch}': it does not share history with '{parent}'.")
+    fork_point = parents.split()[0]
+
+    # Use the first paragraph of the first commit message (the one right after parent)
+    first_message = first_body.strip().split("\n\n")[0].strip() or f"Squashed {count} commits"
+
+    # commit-tree ignores commit.gpgsign, so sign explicitly when it is set
+    sign = run_git("config", "--bool", "commit.gpgsign", check=False).stdout.strip() == "true"
+
+    # Create a single commit with the branch's tree directly on the fork point
+    squashed = run_git(
+        "commit-tree",
+        f"{branch}^{{tree}}",
+        "-p",
+        fork_point,
+        "-m",
+        first_message,
+        *(["-S"] if sign else []),
+    ).stdout.strip()
+
+    ref = branch if branch == "HEAD" else f"refs/heads/{branch}"
+    return run_git("update-ref", "-m", f"gstack: squash {count} commits", ref, squashed)
@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+from collections import deque
+from collections.abc import Iterator
 from typing import Literal, Optional
 
 from pydantic import BaseModel, Field
@@ -64,22 +66,44 @@ class StackConfig(BaseModel):
         if name not in self.branches:
             raise KeyError(f"Branch '{name}' not found")
 
-        branch_info = self.branches[name]
+        branches = self.branches
+        branch_info = branches.pop(name)
         grandparent = branch_info.parent
 
-        # Reparent children to grandparent
+        # Reparent children to grandparent (plain assignments: pydantic v2
+        # doesn't validate on assignment, so no per-child validation runs)
         for child in branch_info.children:
-            self.branches[child].parent = grandparent
-            # Add to grandparent's children if grandparent is tracked
-            if grandparent in self.branches:
-                self.branches[grandparent].children.append(child)
+            branches[child].parent = grandparent
 
-        # Remove from parent's children list
-        if branch_info.parent in self.branches:
-            self.branches[branch_info.parent].children.remove(name)
+        # Swap the branch for its children in the grandparent's list, if tracked
+        grandparent_info = branches.get(grandparent)
+        if grandparent_info is not None:
+            grandparent_info.children.remove(name)
+            grandparent_info.children.extend(branch_info.children)
 
-        # Remove the branch
-        del self.branches[name]
+    def root_branches(self) -> list[str]:
+        """Get the branches whose parent is the trunk.
+
+        Returns:
+            List of root branch names, in config order.
+        """
+        trunk = self.trunk
+        return [name for name, info in self.branches.items() if info.parent == trunk]
+
+    def children(self, branch: str) -> list[str]:
+        """Get the direct children of a branch.
+
+        Args:
+            branch: The branch (or trunk) to get children for.
+
+        Returns:
+            List of child branch names. The trunk's children are the root branches.
+        """
+        if branch == self.trunk:
+            return self.root_branches()
+        if branch in self.branches:
+            return self.branches[branch].children
+        return []
 
     def get_stack(self, branch: str) -> list[str]:
         """Get the full stack from trunk to the given branch.
@@ -92,53 +116,88 @@ class StackConfig(BaseModel):
 
         Raises:
             KeyError: If the branch is not tracked and is not the trunk.
+            ValueError: If the parent chain contains a cycle.
         """
-        if branch == self.trunk:
-            return [self.trunk]
+        trunk = self.trunk
+        if branch == trunk:
+            return [trunk]
 
         if branch not in self.branches:
             raise KeyError(f"Branch '{branch}' not found")
 
-        # Build path from branch to trunk
-        path = [branch]
+        # Build path from trunk to branch, prepending each parent
+        path: deque[str] = deque()
+        seen: set[str] = set()
         current = branch
 
-        while current != self.trunk:
-            parent = self.branches[current].parent
-            path.append(parent)
-            if parent == self.trunk:
-                break
-            current = parent
+        while current != trunk:
+            if current in seen:
+                raise ValueError(f"Cycle in branch parents at '{current}'")
+            seen.add(current)
+            path.appendleft(current)
+            current = self.branches[current].parent
+
+        path.appendleft(trunk)
+        return list(path)
+
+    def iter_descendants(self, branch: str) -> Iterator[str]:
+        """Iterate over all descendants of a branch.
+
+        Walks the tree breadth-first via each branch's children list, so the
+        trunk's children are looked up once rather than per level.
 
-        # Reverse to get trunk -> branch order
-        return list(reversed(path))
+        Args:
+            branch: The branch to get descendants for.
+
+        Yields:
+            Descendant branch names (children, grandchildren, etc.), parents
+            before their children.
+        """
+        branches = self.branches
+        seen = {branch}
+        queue = deque(self.children(branch))
+
+        while queue:
+            child = queue.popleft()
+            # Guard against a hand-edited config with a parent cycle
+            if child in seen:
+                continue
+            seen.add(child)
+            yield child
+            if child in branches:
+                queue.extend(branches[child].children)
 
     def get_descendants(self, branch: str) -> list[str]:
-        """Get all descendants of a branch recursively.
+        """Get all descendants of a branch.
 
         Args:
             branch: The branch to get descendants for.
 
         Returns:
-            List of all descendant branch names (children, grandchildren, etc.).
+            List of all descendant branch names (children, grandchildren, etc.),
+            parents before their children.
         """
-        descendants: list[str] = []
+        return list(self.iter_descendants(branch))
 
-        # Get direct children
-        if branch == self.trunk:
-            # For trunk, find all branches with trunk as parent
-            children = [name for name, info in self.branches.items() if info.parent == self.trunk]
-        elif branch in self.branches:
-            children = self.branches[branch].children
-        else:
-            return []
+    def get_full_stack(self, branch: str) -> list[str]:
+        """Get every branch in the same stack as a branch, parents first.
+
+        This is the stack's root branch (the ancestor parented on trunk) and
+        all of its descendants, which covers the branch's ancestors, the
+        branch itself and everything stacked on any of them.
 
-        # Recursively get descendants
-        for child in children:
-            descendants.append(child)
-            descendants.extend(self.get_descendants(child))
+        Args:
+            branch: A branch in the stack.
 
-        return descendants
+        Returns:
+            Branch names in topological order (excluding trunk), or an empty
+            list if the branch is not tracked.
+        """
+        if branch not in self.branches:
+            return []
+
+        root = self.get_stack(branch)[1]
+        return [root, *self.iter_descendants(root)]
 
     def topological_sort(self, branches: list[str]) -> list[str]:
         """Sort branches so that parents come before children.
@@ -152,11 +211,26 @@ class StackConfig(BaseModel):
         if not branches:
             return []
 
-        # Calculate depth (distance from trunk) for each branch
+        # Depth (distance from trunk) per branch, memoized so each parent
+        # chain is walked once rather than once per branch being sorted
+        tracked = self.branches
+        depth: dict[str, int] = {self.trunk: 0}
+
         def get_depth(branch: str) -> int:
-            if branch == self.trunk or branch not in self.branches:
-                return 0
-            return len(self.get_stack(branch)) - 1
+            path: list[str] = []
+            current = branch
+            while current not in depth and current in tracked:
+                # Placeholder until the chain is resolved; also stops a parent cycle
+                depth[current] = 0
+                path.append(current)
+                current = tracked[current].parent
+
+            current_depth = depth.get(current, 0)
+            for name in reversed(path):
+                current_depth += 1
+                depth[name] = current_depth
+
+            return depth.get(branch, 0)
 
         # Sort by depth (parents have lower depth than children)
         # Use stable sort to preserve relative order of siblings
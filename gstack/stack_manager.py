@@ -1,13 +1,15 @@
 """Stack manager for gstack configuration and state persistence.
 
-Handles reading/writing the config file (.git/.gstack_config.json) and
-state file (.git/.gstack_state.json). Both files are stored inside .git/
-so they are automatically ignored by git.
+Handles reading/writing the config file (.git/.gstack_config.json),
+state file (.git/.gstack_state.json) and the cache of posted stack diagrams
+(.git/.gstack_diagrams.json). All files are stored inside .git/ so they
+are automatically ignored by git.
 """
 
 from __future__ import annotations
 
 import json
+import os
 from pathlib import Path
 from typing import Optional
 
@@ -32,6 +34,8 @@ class AlreadyInitializedError(Exception):
 
 CONFIG_FILENAME = ".gstack_config.json"
 STATE_FILENAME = ".gstack_state.json"
+STATE_PROGRESS_FILENAME = ".gstack_state.progress"
+DIAGRAM_CACHE_FILENAME = ".gstack_diagrams.json"
 
 
 def get_config_path(repo_root: Path) -> Path:
@@ -58,25 +62,52 @@ def get_state_path(repo_root: Path) -> Path:
     return repo_root / ".git" / STATE_FILENAME
 
 
-def load_config(repo_root: Path) -> StackConfig:
-    """Load the stack config from disk.
+def get_state_progress_path(repo_root: Path) -> Path:
+    """Get the path to the state progress log.
 
     Args:
         repo_root: Repository root directory.
 
     Returns:
-        StackConfig loaded from file, or default empty config if file doesn't exist.
+        Path to .git/.gstack_state.progress.
+    """
+    return repo_root / ".git" / STATE_PROGRESS_FILENAME
 
-    Raises:
-        ConfigError: If the config file exists but is invalid.
+
+def get_diagram_cache_path(repo_root: Path) -> Path:
+    """Get the path to the posted stack diagram cache.
+
+    Args:
+        repo_root: Repository root directory.
+
+    Returns:
+        Path to .git/.gstack_diagrams.json.
     """
-    config_path = get_config_path(repo_root)
+    return repo_root / ".git" / DIAGRAM_CACHE_FILENAME
 
-    if not config_path.exists():
-        return StackConfig()
 
+def _write_atomic(path: Path, content: str) -> None:
+    """Write a file by renaming a fully written temp file over it.
+
+    A crash mid-write leaves either the old or the new file, never a
+    truncated one.
+
+    Args:
+        path: File to write.
+        content: Text to write.
+    """
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_text(content)
+    os.replace(tmp_path, path)
+
+
+def _parse_config(content: bytes) -> StackConfig:
+    """Parse raw config file content (pydantic parses the bytes directly).
+
+    Raises:
+        ConfigError: If the content is not a valid config.
+    """
     try:
-        content = config_path.read_text()
         return StackConfig.model_validate_json(content)
     except json.JSONDecodeError as e:
         raise ConfigError(f"Invalid JSON in config file: {e}") from e
@@ -84,6 +115,65 @@ def load_config(repo_root: Path) -> StackConfig:
         raise ConfigError(f"Invalid config format: {e}") from e
 
 
+def _read_config(config_path: Path) -> Optional[StackConfig]:
+    """Read and parse the config file in a single open.
+
+    Args:
+        config_path: Path to the config file.
+
+    Returns:
+        StackConfig, or None if the file doesn't exist.
+
+    Raises:
+        ConfigError: If the config file exists but is invalid.
+    """
+    try:
+        content = config_path.read_bytes()
+    except FileNotFoundError:
+        return None
+    return _parse_config(content)
+
+
+def load_config(repo_root: Path) -> StackConfig:
+    """Load the stack config from disk.
+
+    Args:
+        repo_root: Repository root directory.
+
+    Returns:
+        StackConfig loaded from file, or default empty config if file doesn't exist.
+
+    Raises:
+        ConfigError: If the config file exists but is invalid.
+    """
+    config = _read_config(get_config_path(repo_root))
+    if config is None:
+        return StackConfig()
+    return config
+
+
+def load_initialized_config(repo_root: Path) -> StackConfig:
+    """Load the stack config, requiring gstack to be initialized.
+
+    Combines require_initialized() and load_config() into a single read of
+    the config file.
+
+    Args:
+        repo_root: Repository root directory.
+
+    Returns:
+        StackConfig loaded from file.
+
+    Raises:
+        NotInitializedError: If the config file doesn't exist.
+        ConfigError: If the config file exists but is invalid.
+    """
+    config = _read_config(get_config_path(repo_root))
+    if config is None:
+        raise NotInitializedError()
+    return config
+
+
 def save_config(config: StackConfig, repo_root: Path) -> None:
     """Save the stack config to disk.
 
@@ -92,7 +182,16 @@ def save_config(config: StackConfig, repo_root: Path) -> None:
         repo_root: Repository root directory.
     """
     config_path = get_config_path(repo_root)
-    config_path.write_text(config.model_dump_json(indent=2))
+    content = config.model_dump_json(indent=2)
+
+    # Leave an identical file alone, keeping its mtime
+    try:
+        unchanged = config_path.read_text() == content
+    except FileNotFoundError:
+        unchanged = False
+
+    if not unchanged:
+        _write_atomic(config_path, content)
 
 
 def init_config(
@@ -113,9 +212,7 @@ def init_config(
     Raises:
         AlreadyInitializedError: If already initialized and force=False.
     """
-    config_path = get_config_path(repo_root)
-
-    if config_path.exists() and not force:
+    if not force and os.path.exists(get_config_path(repo_root)):
         raise AlreadyInitializedError("gstack is already initialized. Use --force to reinitialize.")
 
     # Auto-detect trunk if not specified
@@ -137,7 +234,7 @@ def is_initialized(repo_root: Path) -> bool:
     Returns:
         True if config file exists.
     """
-    return get_config_path(repo_root).exists()
+    return os.path.exists(get_config_path(repo_root))
 
 
 def require_initialized(repo_root: Path) -> None:
@@ -156,19 +253,36 @@ def require_initialized(repo_root: Path) -> None:
 def load_state(repo_root: Path) -> Optional[SyncState]:
     """Load the sync state from disk.
 
+    Progress recorded with save_state_progress() since the last save_state()
+    is applied on top of the saved state.
+
     Args:
         repo_root: Repository root directory.
 
     Returns:
         SyncState if file exists, None otherwise.
     """
-    state_path = get_state_path(repo_root)
-
-    if not state_path.exists():
+    try:
+        content = get_state_path(repo_root).read_bytes()
+    except FileNotFoundError:
         return None
 
-    content = state_path.read_text()
-    return SyncState.model_validate_json(content)
+    state = SyncState.model_validate_json(content)
+
+    try:
+        progress = get_state_progress_path(repo_root).read_text()
+    except FileNotFoundError:
+        return state
+
+    # Only complete lines count; a crash can leave a partial last entry.
+    # A garbled entry is ignored the same way, leaving the saved index.
+    entries = progress.split("\n")[:-1]
+    if entries:
+        try:
+            state.current_index = max(state.current_index, int(entries[-1]))
+        except ValueError:
+            pass
+    return state
 
 
 def save_state(state: SyncState, repo_root: Path) -> None:
@@ -178,8 +292,23 @@ def save_state(state: SyncState, repo_root: Path) -> None:
         state: SyncState to save.
         repo_root: Repository root directory.
     """
-    state_path = get_state_path(repo_root)
-    state_path.write_text(state.model_dump_json(indent=2))
+    _write_atomic(get_state_path(repo_root), state.model_dump_json(indent=2))
+    # The saved state now includes any logged progress
+    get_state_progress_path(repo_root).unlink(missing_ok=True)
+
+
+def save_state_progress(state: SyncState, repo_root: Path) -> None:
+    """Record that a saved state has advanced to state.current_index.
+
+    Appends one line to a progress log instead of rewriting the state file;
+    only current_index may have changed since the last save_state().
+
+    Args:
+        state: SyncState whose current_index advanced.
+        repo_root: Repository root directory.
+    """
+    with open(get_state_progress_path(repo_root), "a") as f:
+        f.write(f"{state.current_index}\n")
 
 
 def clear_state(repo_root: Path) -> None:
@@ -188,10 +317,8 @@ def clear_state(repo_root: Path) -> None:
     Args:
         repo_root: Repository root directory.
     """
-    state_path = get_state_path(repo_root)
-
-    if state_path.exists():
-        state_path.unlink()
+    get_state_path(repo_root).unlink(missing_ok=True)
+    get_state_progress_path(repo_root).unlink(missing_ok=True)
 
 
 def has_pending_state(repo_root: Path) -> bool:
@@ -203,23 +330,66 @@ def has_pending_state(repo_root: Path) -> bool:
     Returns:
         True if state file exists.
     """
-    return get_state_path(repo_root).exists()
+    return os.path.exists(get_state_path(repo_root))
+
+
+def load_diagram_hashes(repo_root: Path) -> dict[str, str]:
+    """Load the hashes of the stack diagrams last posted to each branch's PR.
+
+    Args:
+        repo_root: Repository root directory.
+
+    Returns:
+        Dict of branch name -> diagram hash (empty if missing or unreadable).
+    """
+    try:
+        hashes = json.loads(get_diagram_cache_path(repo_root).read_bytes())
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+    return hashes if isinstance(hashes, dict) else {}
+
 
+def save_diagram_hashes(hashes: dict[str, str], repo_root: Path) -> None:
+    """Save the hashes of the stack diagrams posted to each branch's PR.
 
-def register_branch(name: str, parent: str, repo_root: Path) -> None:
+    Args:
+        hashes: Dict of branch name -> diagram hash.
+        repo_root: Repository root directory.
+    """
+    _write_atomic(get_diagram_cache_path(repo_root), json.dumps(hashes, indent=2, sort_keys=True))
+
+
+def register_branch(
+    name: str,
+    parent: str,
+    repo_root: Path,
+    *,
+    config: Optional[StackConfig] = None,
+) -> StackConfig:
     """Register a new branch in the stack.
 
     Args:
         name: Branch name to register.
         parent: Parent branch name.
         repo_root: Repository root directory.
+        config: Already loaded config to update (loaded from disk if None).
+
+    Returns:
+        The updated (and saved) StackConfig.
     """
-    config = load_config(repo_root)
+    if config is None:
+        config = load_config(repo_root)
     config.add_branch(name, parent)
     save_config(config, repo_root)
+    return config
 
 
-def unregister_branch(name: str, repo_root: Path) -> None:
+def unregister_branch(
+    name: str,
+    repo_root: Path,
+    *,
+    config: Optional[StackConfig] = None,
+) -> StackConfig:
     """Unregister a branch from the stack.
 
     Children are automatically reparented to the grandparent.
@@ -227,19 +397,32 @@ def unregister_branch(name: str, repo_root: Path) -> None:
     Args:
         name: Branch name to unregister.
         repo_root: Repository root directory.
+        config: Already loaded config to update (loaded from disk if None).
+
+    Returns:
+        The updated (and saved) StackConfig.
     """
-    config = load_config(repo_root)
+    if config is None:
+        config = load_config(repo_root)
     config.remove_branch(name)
     save_config(config, repo_root)
+    return config
 
 
-def reparent_branch(name: str, new_parent: str, repo_root: Path) -> str:
+def reparent_branch(
+    name: str,
+    new_parent: str,
+    repo_root: Path,
+    *,
+    config: Optional[StackConfig] = None,
+) -> str:
     """Change a branch's parent in the stack.
 
     Args:
         name: Branch to reparent.
         new_parent: New parent branch name.
         repo_root: Repository root directory.
+        config: Already loaded config to update (loaded from disk if None).
 
     Returns:
         The old parent branch name.
@@ -249,7 +432,8 @@ def reparent_branch(name: str, new_parent: str, repo_root: Path) -> str:
     """
     from gstack.exceptions import BranchNotFoundError
 
-    config = load_config(repo_root)
+    if config is None:
+        config = load_config(repo_root)
 
     if name not in config.branches:
         raise BranchNotFoundError(name)
@@ -5,6 +5,8 @@ Handles the complex multi-step logic for rebasing stacked branches.
 
 from __future__ import annotations
 
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Optional
@@ -18,7 +20,7 @@ from gstack.exceptions import (
     NoPendingOperationError,
     PendingOperationError,
 )
-from gstack.models import SyncState
+from gstack.models import StackConfig, SyncState
 
 
 @dataclass
@@ -27,30 +29,41 @@ class SyncResult:
 
     success: bool
     rebased_branches: list[str] = field(default_factory=list)
+    # Branches left alone because they were already on their parent's tip
+    skipped_branches: list[str] = field(default_factory=list)
     conflict_branch: Optional[str] = None
     message: str = ""
+    # Every branch in the sync queue, parents before children (including
+    # branches that needed no rebase)
+    topo_order: list[str] = field(default_factory=list)
 
 
-def get_merged_branches(repo_root: Path) -> list[str]:
+def get_merged_branches(repo_root: Path, config: Optional[StackConfig] = None) -> list[str]:
     """Get list of tracked branches that have been merged.
 
     Args:
         repo_root: Repository root directory.
+        config: Already loaded config (loaded from disk if None).
 
     Returns:
-        List of branch names that have merged PRs.
+        List of branch names that have merged PRs (empty if gh isn't installed).
     """
-    config = stack_manager.load_config(repo_root)
-    merged = []
+    # Without gh there is nothing to ask; skip spawning a process just to fail
+    if not gh_ops.is_gh_installed():
+        return []
 
-    for branch in config.branches:
-        if gh_ops.is_pr_merged(branch):
-            merged.append(branch)
+    if config is None:
+        config = stack_manager.load_config(repo_root)
+    pr_infos = gh_ops.get_all_pr_infos(list(config.branches))
 
-    return merged
+    return [
+        branch
+        for branch in config.branches
+        if branch in pr_infos and pr_infos[branch].state == "MERGED"
+    ]
 
 
-def run_sync(repo_root: Path) -> SyncResult:
+def run_sync(repo_root: Path, config: Optional[StackConfig] = None) -> SyncResult:
     """Run the sync workflow to rebase the current stack.
 
     Algorithm:
@@ -58,14 +71,15 @@ def run_sync(repo_root: Path) -> SyncResult:
     2. Build queue: current branch + descendants in topological order
     3. Save state
     4. For each branch:
-       a. Checkout branch
-       b. Rebase onto parent
+       a. Squash the branch's commits into one
+       b. Check out the branch and rebase it onto its parent
        c. On conflict: preserve state, return
        d. On success: continue
     5. Cleanup: delete state, return to original branch
 
     Args:
         repo_root: Repository root directory.
+        config: Already loaded config (loaded from disk if None).
 
     Returns:
         SyncResult with success status and rebased branches.
@@ -82,36 +96,21 @@ def run_sync(repo_root: Path) -> SyncResult:
     if stack_manager.has_pending_state(repo_root):
         raise PendingOperationError("sync")
 
-    config = stack_manager.load_config(repo_root)
+    if config is None:
+        config = stack_manager.load_config(repo_root)
     current_branch = git_ops.get_current_branch()
 
     # If on trunk or not tracking any branches, nothing to do
     if current_branch == config.trunk or not config.branches:
         return SyncResult(success=True, message="Nothing to sync.")
 
-    # Build the queue of branches to rebase
-    # Get the full stack: ancestors + current branch + descendants
-    branches_to_sync = set()
-
-    if current_branch in config.branches:
-        # Get full stack from trunk to current branch
-        stack = config.get_stack(current_branch)
-        # Add all branches in the stack (excluding trunk)
-        for branch in stack:
-            if branch != config.trunk:
-                branches_to_sync.add(branch)
-                # Also add descendants of each branch in the stack
-                descendants = config.get_descendants(branch)
-                branches_to_sync.update(descendants)
+    # Build the queue of branches to rebase: ancestors + current branch +
+    # descendants, already in topological order (parents before children)
+    branches_to_sync = config.get_full_stack(current_branch)
 
     if not branches_to_sync:
         return SyncResult(success=True, message="Nothing to sync.")
 
-    branches_to_sync = list(branches_to_sync)
-
-    # Sort topologically (parents before children)
-    branches_to_sync = config.topological_sort(branches_to_sync)
-
     # Save state
     state = SyncState(
         active_command="sync",
@@ -125,13 +124,20 @@ def run_sync(repo_root: Path) -> SyncResult:
     return _execute_sync(repo_root, state, config)
 
 
-def _execute_sync(repo_root: Path, state: SyncState, config=None) -> SyncResult:
+def _execute_sync(
+    repo_root: Path,
+    state: SyncState,
+    config: Optional[StackConfig] = None,
+    rebased_branches: Optional[list[str]] = None,
+) -> SyncResult:
     """Execute the sync loop starting from the current state.
 
     Args:
         repo_root: Repository root directory.
         state: Current sync state.
         config: StackConfig (loaded if not provided).
+        rebased_branches: Branches already rebased earlier in this sync;
+            branches rebased now are appended to it.
 
     Returns:
         SyncResult with status and rebased branches.
@@ -139,7 +145,9 @@ def _execute_sync(repo_root: Path, state: SyncState, config=None) -> SyncResult:
     if config is None:
         config = stack_manager.load_config(repo_root)
 
-    rebased_branches = []
+    if rebased_branches is None:
+        rebased_branches = []
+    skipped_branches = []
 
     while not state.is_complete:
         branch = state.current_branch
@@ -150,19 +158,27 @@ def _execute_sync(repo_root: Path, state: SyncState, config=None) -> SyncResult:
         if branch_info is None:
             # Branch not in config, skip
             state.current_index += 1
-            stack_manager.save_state(state, repo_root)
+            stack_manager.save_state_progress(state, repo_root)
             continue
 
         parent = branch_info.parent
 
-        # Checkout the branch
-        git_ops.checkout_branch(branch)
+        # Already on the parent's tip with at most one commit: squash and
+        # rebase would both be no-ops, so skip the checkout entirely
+        divergence = git_ops.count_divergence(parent, branch)
+        if divergence is not None and divergence[0] == 0 and divergence[1] <= 1:
+            skipped_branches.append(branch)
+            state.current_index += 1
+            stack_manager.save_state_progress(state, repo_root)
+            continue
 
-        # Squash commits before rebasing to reduce conflicts
-        git_ops.squash_commits(parent)
+        if divergence is None or divergence[1] > 1:
+            # Squash commits before rebasing to reduce conflicts (this moves
+            # the branch ref without checking it out)
+            git_ops.squash_commits(parent, branch)
 
-        # Rebase onto parent
-        result = git_ops.rebase(parent, check=False)
+        # Rebase onto parent, letting the rebase switch to the branch itself
+        result = git_ops.rebase(parent, check=False, branch=branch)
 
         if result.returncode != 0:
             # Conflict detected
@@ -170,6 +186,7 @@ def _execute_sync(repo_root: Path, state: SyncState, config=None) -> SyncResult:
             return SyncResult(
                 success=False,
                 rebased_branches=rebased_branches,
+                skipped_branches=skipped_branches,
                 conflict_branch=branch,
                 message=f"Conflict while rebasing '{branch}'. "
                 f"Resolve conflicts, stage files, then run 'gstack continue'.",
@@ -177,7 +194,7 @@ def _execute_sync(repo_root: Path, state: SyncState, config=None) -> SyncResult:
 
         rebased_branches.append(branch)
         state.current_index += 1
-        stack_manager.save_state(state, repo_root)
+        stack_manager.save_state_progress(state, repo_root)
 
     # Success - cleanup
     stack_manager.clear_state(repo_root)
@@ -185,10 +202,15 @@ def _execute_sync(repo_root: Path, state: SyncState, config=None) -> SyncResult:
     # Return to original branch
     git_ops.checkout_branch(state.original_head)
 
+    message = f"Successfully rebased {len(rebased_branches)} branch(es)."
+    if skipped_branches:
+        message += f" {len(skipped_branches)} already up to date."
     return SyncResult(
         success=True,
         rebased_branches=rebased_branches,
-        message=f"Successfully rebased {len(rebased_branches)} branch(es).",
+        skipped_branches=skipped_branches,
+        message=message,
+        topo_order=state.todo_queue,
     )
 
 
@@ -227,8 +249,7 @@ def run_continue(repo_root: Path) -> SyncResult:
     stack_manager.save_state(state, repo_root)
 
     # Continue with the rest
-    result = _execute_sync(repo_root, state, config)
-    result.rebased_branches = rebased_branches + result.rebased_branches
+    result = _execute_sync(repo_root, state, config, rebased_branches)
 
     # Auto-submit after successful sync
     if result.success:
@@ -289,7 +310,7 @@ def run_submit(repo_root: Path) -> SubmitResult:
     1. Validate: workdir clean
     2. Check gh authentication
     3. Sync (rebase) all branches first
-    4. Get full stack from current branch
+    4. Take the stack (in topological order) that sync just walked
     5. For each branch (bottom-up):
        a. Push with force-with-lease (+ -u if first push)
        b. Check if PR exists
@@ -326,90 +347,67 @@ def run_submit(repo_root: Path) -> SubmitResult:
     config = stack_manager.load_config(repo_root)
     current_branch = git_ops.get_current_branch()
 
-    # If on trunk or not tracking any branches, nothing to do
-    if current_branch == config.trunk or not config.branches:
-        return SubmitResult(success=True, message="Nothing to submit.")
-
-    # Build the list of branches to submit
-    # Get the full stack from current branch
-    branches_to_submit = set()
-
-    if current_branch in config.branches:
-        # Get full stack from trunk to current branch
-        stack = config.get_stack(current_branch)
-        # Add all branches in the stack (excluding trunk)
-        for branch in stack:
-            if branch != config.trunk:
-                branches_to_submit.add(branch)
-                # Also add descendants of each branch in the stack
-                descendants = config.get_descendants(branch)
-                branches_to_submit.update(descendants)
+    # Submit the stack sync just walked (empty on trunk or with nothing
+    # tracked), skipping branches that are no longer tracked
+    branches_to_submit = [branch for branch in sync_result.topo_order if branch in config.branches]
 
     if not branches_to_submit:
         return SubmitResult(success=True, message="Nothing to submit.")
 
-    # Sort topologically (parents before children)
-    branches_to_submit = config.topological_sort(list(branches_to_submit))
-
-    pushed_branches = []
-    created_prs = []
-    updated_prs = []
-
-    for branch in branches_to_submit:
-        branch_info = config.branches.get(branch)
-        if branch_info is None:
-            continue
-
-        parent = branch_info.parent
+    # Look up existing PRs for all branches concurrently up front, and the
+    # upstream of every branch with one git call
+    pr_infos = gh_ops.get_pr_infos(branches_to_submit)
+    branch_remotes = git_ops.get_branch_remotes()
 
-        # Push the branch
-        try:
-            # Check if upstream is set
-            has_upstream = _branch_has_upstream(branch)
-            git_ops.push("origin", branch, force_with_lease=True, set_upstream=not has_upstream)
-            pushed_branches.append(branch)
-        except Exception as e:
-            return SubmitResult(
-                success=False,
-                pushed_branches=pushed_branches,
-                created_prs=created_prs,
-                updated_prs=updated_prs,
-                message=f"Failed to push '{branch}': {e}",
-            )
+    # Push all branches with (at most) two git pushes: one setting the
+    # upstream for first-time pushes, one for branches that already track
+    new_branches = [branch for branch in branches_to_submit if branch not in branch_remotes]
+    tracked_branches = [branch for branch in branches_to_submit if branch in branch_remotes]
+    rejected = {}
+    try:
+        rejected.update(
+            git_ops.push_branches("origin", new_branches, force_with_lease=True, set_upstream=True)
+        )
+        rejected.update(git_ops.push_branches("origin", tracked_branches, force_with_lease=True))
+    except Exception as e:
+        return SubmitResult(success=False, message=f"Failed to push: {e}")
 
-        # Check/create/update PR
-        pr_info = gh_ops.get_pr_info(branch)
+    if rejected:
+        first = next(branch for branch in branches_to_submit if branch in rejected)
+        return SubmitResult(
+            success=False,
+            pushed_branches=[branch for branch in branches_to_submit if branch not in rejected],
+            message=f"Failed to push '{first}': {rejected[first]}",
+        )
 
-        if pr_info is None:
-            # Create new PR with a description
-            try:
-                body = f"Part of stack based on `{parent}`.\n\nCreated with [gstack](https://github.com/nicomalacho/stack-branch)."
-                result = gh_ops.create_pr(head=branch, base=parent, body=body)
-                created_prs.append(branch)
-                # Update config with PR URL
-                config.branches[branch].pr_url = result.url
-            except Exception as e:
-                # PR creation failed - log but continue with other branches
-                typer.echo(f"  Warning: Failed to create PR for '{branch}': {e}", err=True)
-                pass
-        else:
-            # PR exists - check if base needs updating
-            if pr_info.base != parent:
-                try:
-                    gh_ops.update_pr_base(branch, parent)
-                    updated_prs.append(branch)
-                except Exception:
-                    # Base update failed - not critical
-                    pass
+    pushed_branches = list(branches_to_submit)
+    created_prs = []
+    updated_prs = []
 
+    # Create or update the PRs concurrently; each is an independent gh call.
+    # Results are applied in stack order on this thread.
+    def reconcile(branch: str) -> tuple[str, Optional[str], Optional[str]]:
+        return _reconcile_pr(branch, config.branches[branch].parent, pr_infos.get(branch))
+
+    with ThreadPoolExecutor(max_workers=min(8, len(branches_to_submit))) as executor:
+        outcomes = list(executor.map(reconcile, branches_to_submit))
+
+    for branch, (action, pr_url, warning) in zip(branches_to_submit, outcomes):
+        if warning:
+            typer.echo(f"  Warning: {warning}", err=True)
+        if action == "created":
+            created_prs.append(branch)
+        elif action == "updated":
+            updated_prs.append(branch)
+        if pr_url:
             # Update config with PR URL
-            config.branches[branch].pr_url = pr_info.url
+            config.branches[branch].pr_url = pr_url
 
     # Save config with PR URLs
     stack_manager.save_config(config, repo_root)
 
     # Post mermaid diagram to all PRs in the stack
-    _post_stack_diagrams(config, branches_to_submit, current_branch)
+    _post_stack_diagrams(config, branches_to_submit, current_branch, repo_root)
 
     return SubmitResult(
         success=True,
@@ -422,16 +420,65 @@ def run_submit(repo_root: Path) -> SubmitResult:
     )
 
 
-def _post_stack_diagrams(config, branches: list[str], current_branch: str) -> None:
+def _reconcile_pr(
+    branch: str, parent: str, pr_info: Optional[gh_ops.PrInfo]
+) -> tuple[str, Optional[str], Optional[str]]:
+    """Create the PR for a pushed branch, or fix the base of its existing PR.
+
+    Safe to run from a worker thread: it only talks to gh and returns what
+    happened instead of touching shared state.
+
+    Args:
+        branch: Branch that was pushed.
+        parent: Parent branch (the PR's base).
+        pr_info: The branch's existing PR, or None.
+
+    Returns:
+        Tuple of (action, PR URL, warning). action is "created", "updated"
+        or "" if nothing changed.
+    """
+    if pr_info is None:
+        # Create new PR with a description
+        try:
+            body = f"Part of stack based on `{parent}`.\n\nCreated with [gstack](https://github.com/nicomalacho/stack-branch)."
+            result = gh_ops.create_pr(head=branch, base=parent, body=body)
+            return "created", result.url, None
+        except Exception as e:
+            # PR creation failed - report but continue with other branches
+            return "", None, f"Failed to create PR for '{branch}': {e}"
+
+    # PR exists - check if base needs updating
+    if pr_info.base != parent:
+        try:
+            gh_ops.update_pr_base(branch, parent)
+            return "updated", pr_info.url, None
+        except Exception:
+            # Base update failed - not critical
+            pass
+
+    return "", pr_info.url, None
+
+
+def _diagram_hash(pr_url: Optional[str], diagram: str) -> str:
+    """Hash a diagram together with the PR it is posted to."""
+    return hashlib.sha256(f"{pr_url}\n{diagram}".encode()).hexdigest()
+
+
+def _post_stack_diagrams(config, branches: list[str], current_branch: str, repo_root: Path) -> None:
     """Post mermaid stack diagrams to all PRs in the given branches.
 
+    PRs that already show the same diagram (according to the hashes cached
+    by the last post) are skipped.
+
     Args:
         config: StackConfig with branch info.
         branches: List of branches to post diagrams to.
         current_branch: Currently checked out branch.
+        repo_root: Repository root directory.
     """
     # Only include branches that are in the submit list
-    relevant_branches = {name: info for name, info in config.branches.items() if name in branches}
+    branch_set = set(branches)
+    relevant_branches = {name: info for name, info in config.branches.items() if name in branch_set}
 
     if not relevant_branches:
         return
@@ -443,19 +490,26 @@ def _post_stack_diagrams(config, branches: list[str], current_branch: str) -> No
         current_branch,
     )
 
-    # Post to each PR
-    for branch in branches:
-        try:
-            gh_ops.add_or_update_stack_comment(branch, diagram)
-        except Exception:
-            # Non-critical - don't fail submit if diagram posting fails
-            pass
+    hashes = stack_manager.load_diagram_hashes(repo_root)
+    new_hashes = {
+        branch: _diagram_hash(relevant_branches[branch].pr_url, diagram) for branch in branches
+    }
+    branches = [branch for branch in branches if hashes.get(branch) != new_hashes[branch]]
+    if not branches:
+        return
 
+    try:
+        # PRs whose part of the batched mutation fails are retried on their
+        # own inside; any left unposted aren't cached, so the next submit
+        # tries them again
+        posted = gh_ops.add_or_update_stack_comments(branches, diagram)
+    except Exception:
+        # Non-critical - don't fail submit if diagram posting fails
+        return
 
-def _branch_has_upstream(branch: str) -> bool:
-    """Check if a branch has an upstream tracking branch configured."""
-    result = git_ops.run_git("config", "--get", f"branch.{branch}.remote", check=False)
-    return result.returncode == 0
+    if posted:
+        hashes.update({branch: new_hashes[branch] for branch in posted})
+        stack_manager.save_diagram_hashes(hashes, repo_root)
 
 
 @dataclass
@@ -514,7 +568,7 @@ def run_push(repo_root: Path) -> PushResult:
 
     # Push the branch
     try:
-        has_upstream = _branch_has_upstream(current_branch)
+        has_upstream = current_branch in git_ops.get_branch_remotes()
         git_ops.push("origin", current_branch, force_with_lease=True, set_upstream=not has_upstream)
     except Exception as e:
         return PushResult(
@@ -559,6 +613,11 @@ def run_push(repo_root: Path) -> PushResult:
     # Save config with PR URL
     stack_manager.save_config(config, repo_root)
 
+    # The diagram posted below replaces the one submit last cached for this PR
+    hashes = stack_manager.load_diagram_hashes(repo_root)
+    if hashes.pop(current_branch, None) is not None:
+        stack_manager.save_diagram_hashes(hashes, repo_root)
+
     # Post mermaid diagram to the PR
     try:
         # Get full stack for the diagram
@@ -661,7 +720,7 @@ def run_move(repo_root: Path, branch: str, new_parent: str) -> MoveResult:
         )
 
     # Update config
-    stack_manager.reparent_branch(branch, new_parent, repo_root)
+    stack_manager.reparent_branch(branch, new_parent, repo_root, config=config)
 
     # Checkout and rebase
     git_ops.checkout_branch(branch)
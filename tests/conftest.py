@@ -2,9 +2,8 @@
 
 from __future__ import annotations
 
-import os
+import shutil
 import subprocess
-from collections.abc import Generator
 from pathlib import Path
 from typing import TYPE_CHECKING, Optional
 from unittest.mock import MagicMock
@@ -15,32 +14,27 @@ if TYPE_CHECKING:
     from pytest_mock import MockerFixture
 
 
-@pytest.fixture
-def temp_git_repo(tmp_path: Path) -> Generator[Path, None, None]:
-    """Create a temporary git repository with an initial commit.
+@pytest.fixture(autouse=True)
+def _reset_gh_auth_cache() -> None:
+    """Forget a cached successful gh auth check so each test's mocks apply."""
+    from gstack import gh_ops
 
-    The repository is initialized with:
-    - 'main' as the default branch
-    - An initial commit with a README file
-    - Working directory changed to the repo root
+    gh_ops._gh_authenticated = False
 
-    Yields:
-        Path to the temporary repository root.
-    """
-    original_cwd = os.getcwd()
-    repo_path = tmp_path / "repo"
-    repo_path.mkdir()
-    os.chdir(repo_path)
 
-    # Initialize git repo with 'main' as default branch
-    subprocess.run(["git", "init", "-b", "main"], check=True, capture_output=True)
+def _init_repo(repo_path: Path) -> None:
+    """Initialize a git repository with 'main' as default branch and one commit."""
+    repo_path.mkdir()
+    subprocess.run(["git", "init", "-b", "main"], cwd=repo_path, check=True, capture_output=True)
     subprocess.run(
         ["git", "config", "user.email", "test@example.com"],
+        cwd=repo_path,
         check=True,
         capture_output=True,
     )
     subprocess.run(
         ["git", "config", "user.name", "Test User"],
+        cwd=repo_path,
         check=True,
         capture_output=True,
     )
@@ -48,48 +42,120 @@ def temp_git_repo(tmp_path: Path) -> Generator[Path, None, None]:
     # Create initial commit
     readme = repo_path / "README.md"
     readme.write_text("# Test Repository\n")
-    subprocess.run(["git", "add", "README.md"], check=True, capture_output=True)
+    subprocess.run(["git", "add", "README.md"], cwd=repo_path, check=True, capture_output=True)
     subprocess.run(
         ["git", "commit", "-m", "Initial commit"],
+        cwd=repo_path,
         check=True,
         capture_output=True,
     )
 
-    yield repo_path
 
-    # Restore original working directory
-    os.chdir(original_cwd)
+@pytest.fixture(scope="session")
+def _template_repo(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    """Build the initial repository once per session; tests get copies of it."""
+    repo_path = tmp_path_factory.mktemp("template") / "repo"
+    _init_repo(repo_path)
+    return repo_path
 
 
-@pytest.fixture
-def temp_git_repo_with_remote(temp_git_repo: Path, tmp_path: Path) -> Generator[Path, None, None]:
-    """Create a temporary git repository with a bare remote.
+@pytest.fixture(scope="session")
+def _template_repo_with_remote(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    """Build a repository pushed to a bare remote once per session.
 
-    Extends temp_git_repo with:
-    - A bare remote repository at tmp_path/remote.git
-    - Remote 'origin' configured pointing to the bare repo
-    - Initial push to origin/main
-
-    Yields:
-        Path to the temporary repository root (same as temp_git_repo).
+    Returns:
+        Directory containing 'repo' and 'remote.git'.
     """
-    # Create bare remote
-    remote_path = tmp_path / "remote.git"
+    root = tmp_path_factory.mktemp("template_with_remote")
+    repo_path = root / "repo"
+    remote_path = root / "remote.git"
+    _init_repo(repo_path)
     subprocess.run(["git", "init", "--bare", str(remote_path)], check=True, capture_output=True)
-
-    # Add remote and push
+    # Relative, so every copy of the pair resolves origin to its own remote
     subprocess.run(
-        ["git", "remote", "add", "origin", str(remote_path)],
+        ["git", "remote", "add", "origin", "../remote.git"],
+        cwd=repo_path,
         check=True,
         capture_output=True,
     )
     subprocess.run(
         ["git", "push", "-u", "origin", "main"],
+        cwd=repo_path,
         check=True,
         capture_output=True,
     )
+    return root
+
+
+@pytest.fixture
+def temp_git_repo(tmp_path: Path, _template_repo: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Create a temporary git repository with an initial commit.
+
+    The repository is initialized with:
+    - 'main' as the default branch
+    - An initial commit with a README file
+    - Working directory changed to the repo root
+
+    It is a copy of a repository built once per session, which saves the git
+    processes of building it for every test.
+
+    Returns:
+        Path to the temporary repository root.
+    """
+    repo_path = tmp_path / "repo"
+    shutil.copytree(_template_repo, repo_path, symlinks=True)
+    # Restored by monkeypatch at teardown
+    monkeypatch.chdir(repo_path)
+    return repo_path
+
+
+@pytest.fixture
+def temp_git_repo_with_remote(
+    tmp_path: Path, _template_repo_with_remote: Path, monkeypatch: pytest.MonkeyPatch
+) -> Path:
+    """Create a temporary git repository with a bare remote.
+
+    Extends temp_git_repo with:
+    - A bare remote repository at tmp_path/remote.git
+    - Remote 'origin' configured pointing to the bare repo
+    - Initial push to origin/main
+
+    Returns:
+        Path to the temporary repository root.
+    """
+    repo_path = tmp_path / "repo"
+    remote_path = tmp_path / "remote.git"
+    shutil.copytree(_template_repo_with_remote / "repo", repo_path, symlinks=True)
+    shutil.copytree(_template_repo_with_remote / "remote.git", remote_path, symlinks=True)
+    monkeypatch.chdir(repo_path)
+    return repo_path
+
+
+@pytest.fixture
+def initialized_repo(temp_git_repo: Path) -> Path:
+    """temp_git_repo with gstack initialized (trunk 'main').
+
+    Returns:
+        Path to the temporary repository root.
+    """
+    from gstack import stack_manager
+
+    stack_manager.init_config(temp_git_repo)
+    return temp_git_repo
+
+
+@pytest.fixture
+def repo_with_feature(initialized_repo: Path) -> Path:
+    """initialized_repo with a tracked 'feature' branch on main, checked out.
+
+    Returns:
+        Path to the temporary repository root.
+    """
+    from gstack import git_ops, stack_manager
 
-    yield temp_git_repo
+    git_ops.checkout_branch("feature", create=True)
+    stack_manager.register_branch("feature", "main", initialized_repo)
+    return initialized_repo
 
 
 @pytest.fixture
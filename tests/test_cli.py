@@ -3,6 +3,7 @@
 import subprocess
 from pathlib import Path
 
+import pytest
 from typer.testing import CliRunner
 
 from gstack import stack_manager
@@ -11,6 +12,19 @@ from gstack.main import app
 runner = CliRunner()
 
 
+def head_branch(repo: Path) -> str:
+    """Read the checked-out branch from .git/HEAD (no git process)."""
+    return (repo / ".git" / "HEAD").read_text().strip().removeprefix("ref: refs/heads/")
+
+
+def branch_exists(repo: Path, name: str) -> bool:
+    """Check for a local branch in the loose or packed refs (no git process)."""
+    if (repo / ".git" / "refs" / "heads" / name).exists():
+        return True
+    packed = repo / ".git" / "packed-refs"
+    return packed.exists() and f" refs/heads/{name}\n" in packed.read_text()
+
+
 class TestInitCommand:
     """Tests for gstack init command."""
 
@@ -52,99 +66,73 @@ class TestInitCommand:
         assert result.exit_code == 0
         assert "initialized" in result.stdout.lower()
 
-    def test_fails_if_already_initialized(self, temp_git_repo: Path) -> None:
+    def test_fails_if_already_initialized(self, initialized_repo: Path) -> None:
         """Fails if already initialized."""
-        runner.invoke(app, ["init"])
         result = runner.invoke(app, ["init"])
 
         assert result.exit_code != 0
         assert "already" in result.stdout.lower()
 
-    def test_force_reinitializes(self, temp_git_repo: Path) -> None:
+    def test_force_reinitializes(self, initialized_repo: Path) -> None:
         """--force flag allows reinitialization."""
-        runner.invoke(app, ["init"])
         # Add a branch to the config
-        config = stack_manager.load_config(temp_git_repo)
+        config = stack_manager.load_config(initialized_repo)
         config.add_branch("feature", parent="main")
-        stack_manager.save_config(config, temp_git_repo)
+        stack_manager.save_config(config, initialized_repo)
 
         result = runner.invoke(app, ["init", "--force"])
 
         assert result.exit_code == 0
-        config = stack_manager.load_config(temp_git_repo)
+        config = stack_manager.load_config(initialized_repo)
         assert config.branches == {}
 
-    def test_fails_outside_git_repo(self, tmp_path: Path) -> None:
+    def test_fails_outside_git_repo(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
         """Fails when run outside a git repository."""
-        import os
-
-        original_cwd = os.getcwd()
-        os.chdir(tmp_path)
+        monkeypatch.chdir(tmp_path)
 
-        try:
-            result = runner.invoke(app, ["init"])
-            assert result.exit_code != 0
-            assert "not a git repository" in result.stdout.lower()
-        finally:
-            os.chdir(original_cwd)
+        result = runner.invoke(app, ["init"])
+        assert result.exit_code != 0
+        assert "not a git repository" in result.stdout.lower()
 
 
 class TestCreateCommand:
     """Tests for gstack create command."""
 
-    def test_creates_git_branch(self, temp_git_repo: Path) -> None:
+    def test_creates_git_branch(self, initialized_repo: Path) -> None:
         """Creates a new git branch."""
-        runner.invoke(app, ["init"])
-
         result = runner.invoke(app, ["create", "feature-login"])
 
         assert result.exit_code == 0
         # Verify branch exists in git
-        git_result = subprocess.run(
-            ["git", "rev-parse", "--verify", "refs/heads/feature-login"],
-            capture_output=True,
-        )
-        assert git_result.returncode == 0
+        assert branch_exists(initialized_repo, "feature-login")
 
-    def test_switches_to_new_branch(self, temp_git_repo: Path) -> None:
+    def test_switches_to_new_branch(self, initialized_repo: Path) -> None:
         """Switches to the newly created branch."""
-        runner.invoke(app, ["init"])
-
         runner.invoke(app, ["create", "feature-login"])
 
         # Verify we're on the new branch
-        result = subprocess.run(
-            ["git", "rev-parse", "--abbrev-ref", "HEAD"],
-            capture_output=True,
-            text=True,
-        )
-        assert result.stdout.strip() == "feature-login"
+        assert head_branch(initialized_repo) == "feature-login"
 
-    def test_registers_branch_in_config(self, temp_git_repo: Path) -> None:
+    def test_registers_branch_in_config(self, initialized_repo: Path) -> None:
         """Registers the new branch in gstack config."""
-        runner.invoke(app, ["init"])
-
         runner.invoke(app, ["create", "feature-login"])
 
-        config = stack_manager.load_config(temp_git_repo)
+        config = stack_manager.load_config(initialized_repo)
         assert "feature-login" in config.branches
         assert config.branches["feature-login"].parent == "main"
 
-    def test_creates_stacked_branch(self, temp_git_repo: Path) -> None:
+    def test_creates_stacked_branch(self, initialized_repo: Path) -> None:
         """Can create a branch stacked on another branch."""
-        runner.invoke(app, ["init"])
         runner.invoke(app, ["create", "feature-login"])
 
         runner.invoke(app, ["create", "feature-login-ui"])
 
-        config = stack_manager.load_config(temp_git_repo)
+        config = stack_manager.load_config(initialized_repo)
         assert config.branches["feature-login-ui"].parent == "feature-login"
         assert "feature-login-ui" in config.branches["feature-login"].children
 
-    def test_shows_success_message(self, temp_git_repo: Path) -> None:
+    def test_shows_success_message(self, initialized_repo: Path) -> None:
         """Shows success message after create."""
-        runner.invoke(app, ["init"])
-
         result = runner.invoke(app, ["create", "feature-login"])
 
         assert result.exit_code == 0
@@ -157,65 +145,54 @@ class TestCreateCommand:
         assert result.exit_code != 0
         assert "not initialized" in result.stdout.lower() or "init" in result.stdout.lower()
 
-    def test_fails_if_branch_exists(self, temp_git_repo: Path) -> None:
+    def test_fails_if_branch_exists(self, initialized_repo: Path) -> None:
         """Fails if branch already exists in git."""
-        runner.invoke(app, ["init"])
-        subprocess.run(["git", "checkout", "-b", "existing"], check=True, capture_output=True)
-        subprocess.run(["git", "checkout", "main"], check=True, capture_output=True)
+        subprocess.run(["git", "branch", "existing"], check=True, capture_output=True)
 
         result = runner.invoke(app, ["create", "existing"])
 
         assert result.exit_code != 0
         assert "exists" in result.stdout.lower()
 
-    def test_works_with_dirty_workdir(self, temp_git_repo: Path) -> None:
+    def test_works_with_dirty_workdir(self, initialized_repo: Path) -> None:
         """Works even if working directory has uncommitted changes."""
-        runner.invoke(app, ["init"])
-        (temp_git_repo / "newfile.txt").write_text("uncommitted")
+        (initialized_repo / "newfile.txt").write_text("uncommitted")
 
         result = runner.invoke(app, ["create", "feature-login"])
 
         assert result.exit_code == 0
         assert "feature-login" in result.stdout
 
-    def test_parent_option(self, temp_git_repo: Path) -> None:
+    def test_parent_option(self, initialized_repo: Path) -> None:
         """Can specify parent with --parent option."""
-        runner.invoke(app, ["init"])
         runner.invoke(app, ["create", "feature-a"])
         subprocess.run(["git", "checkout", "main"], check=True, capture_output=True)
 
         result = runner.invoke(app, ["create", "feature-b", "--parent", "feature-a"])
 
         assert result.exit_code == 0
-        config = stack_manager.load_config(temp_git_repo)
+        config = stack_manager.load_config(initialized_repo)
         assert config.branches["feature-b"].parent == "feature-a"
 
 
 class TestLogCommand:
     """Tests for gstack log command."""
 
-    def test_shows_empty_stack(self, temp_git_repo: Path) -> None:
+    def test_shows_empty_stack(self, initialized_repo: Path) -> None:
         """Shows message when no stacked branches exist."""
-        runner.invoke(app, ["init"])
-
         result = runner.invoke(app, ["log"])
 
         assert result.exit_code == 0
 
-    def test_shows_single_branch(self, temp_git_repo: Path) -> None:
+    def test_shows_single_branch(self, repo_with_feature: Path) -> None:
         """Shows a single stacked branch."""
-        runner.invoke(app, ["init"])
-        runner.invoke(app, ["create", "feature"])
-
         result = runner.invoke(app, ["log"])
 
         assert result.exit_code == 0
         assert "feature" in result.stdout
 
-    def test_shows_stack_hierarchy(self, temp_git_repo: Path) -> None:
+    def test_shows_stack_hierarchy(self, repo_with_feature: Path) -> None:
         """Shows branches in stack hierarchy."""
-        runner.invoke(app, ["init"])
-        runner.invoke(app, ["create", "feature"])
         runner.invoke(app, ["create", "feature-ui"])
 
         result = runner.invoke(app, ["log"])
@@ -224,74 +201,82 @@ class TestLogCommand:
         assert "feature" in result.stdout
         assert "feature-ui" in result.stdout
 
-    def test_indicates_current_branch(self, temp_git_repo: Path) -> None:
+    def test_indicates_current_branch(self, repo_with_feature: Path) -> None:
         """Indicates which branch is currently checked out."""
-        runner.invoke(app, ["init"])
-        runner.invoke(app, ["create", "feature"])
-
         result = runner.invoke(app, ["log"])
 
         # Should show some indicator for current branch
         assert result.exit_code == 0
 
+    def test_prints_depth_first_with_indentation(self, repo_with_feature: Path) -> None:
+        """Children are printed under their parent, one level deeper, in order."""
+        runner.invoke(app, ["create", "feature-ui"])
+        runner.invoke(app, ["create", "other", "--parent", "main"])
+
+        result = runner.invoke(app, ["log"])
+
+        assert result.exit_code == 0
+        assert result.stdout.splitlines() == [
+            "Trunk: main",
+            "    feature",
+            "      feature-ui",
+            "  * other",
+        ]
+
+    def test_skips_untracked_children(self, repo_with_feature: Path) -> None:
+        """A child listed in the config but no longer tracked is not printed."""
+        config = stack_manager.load_config(repo_with_feature)
+        config.branches["feature"].children.append("gone")
+        stack_manager.save_config(config, repo_with_feature)
+
+        result = runner.invoke(app, ["log"])
+
+        assert result.exit_code == 0
+        assert "gone" not in result.stdout
+
 
 class TestDeleteCommand:
     """Tests for gstack delete command."""
 
-    def test_removes_branch_from_config(self, temp_git_repo: Path) -> None:
+    def test_removes_branch_from_config(self, repo_with_feature: Path) -> None:
         """Removes branch from gstack config."""
-        runner.invoke(app, ["init"])
-        runner.invoke(app, ["create", "feature"])
         subprocess.run(["git", "checkout", "main"], check=True, capture_output=True)
 
         result = runner.invoke(app, ["delete", "feature"])
 
         assert result.exit_code == 0
-        config = stack_manager.load_config(temp_git_repo)
+        config = stack_manager.load_config(repo_with_feature)
         assert "feature" not in config.branches
 
-    def test_deletes_git_branch(self, temp_git_repo: Path) -> None:
+    def test_deletes_git_branch(self, repo_with_feature: Path) -> None:
         """Deletes the git branch."""
-        runner.invoke(app, ["init"])
-        runner.invoke(app, ["create", "feature"])
         subprocess.run(["git", "checkout", "main"], check=True, capture_output=True)
 
         runner.invoke(app, ["delete", "feature"])
 
-        git_result = subprocess.run(
-            ["git", "rev-parse", "--verify", "refs/heads/feature"],
-            capture_output=True,
-        )
-        assert git_result.returncode != 0
+        assert not branch_exists(repo_with_feature, "feature")
 
-    def test_reparents_children(self, temp_git_repo: Path) -> None:
+    def test_reparents_children(self, repo_with_feature: Path) -> None:
         """Reparents child branches to grandparent."""
-        runner.invoke(app, ["init"])
-        runner.invoke(app, ["create", "feature"])
         runner.invoke(app, ["create", "feature-ui"])
         subprocess.run(["git", "checkout", "main"], check=True, capture_output=True)
 
         runner.invoke(app, ["delete", "feature", "--force"])
 
-        config = stack_manager.load_config(temp_git_repo)
+        config = stack_manager.load_config(repo_with_feature)
         assert "feature" not in config.branches
         assert config.branches["feature-ui"].parent == "main"
 
-    def test_fails_if_branch_not_tracked(self, temp_git_repo: Path) -> None:
+    def test_fails_if_branch_not_tracked(self, initialized_repo: Path) -> None:
         """Fails if branch is not tracked by gstack."""
-        runner.invoke(app, ["init"])
-        subprocess.run(["git", "checkout", "-b", "untracked"], check=True, capture_output=True)
-        subprocess.run(["git", "checkout", "main"], check=True, capture_output=True)
+        subprocess.run(["git", "branch", "untracked"], check=True, capture_output=True)
 
         result = runner.invoke(app, ["delete", "untracked"])
 
         assert result.exit_code != 0
 
-    def test_fails_if_on_branch_to_delete(self, temp_git_repo: Path) -> None:
+    def test_fails_if_on_branch_to_delete(self, repo_with_feature: Path) -> None:
         """Fails if trying to delete the current branch."""
-        runner.invoke(app, ["init"])
-        runner.invoke(app, ["create", "feature"])
-
         result = runner.invoke(app, ["delete", "feature"])
 
         assert result.exit_code != 0
@@ -308,21 +293,17 @@ class TestSubmitCommand:
         assert result.exit_code != 0
         assert "not initialized" in result.stdout.lower() or "init" in result.stdout.lower()
 
-    def test_fails_if_workdir_dirty(self, temp_git_repo: Path) -> None:
+    def test_fails_if_workdir_dirty(self, initialized_repo: Path) -> None:
         """Fails if working directory has uncommitted changes."""
-        runner.invoke(app, ["init"])
-        (temp_git_repo / "dirty.txt").write_text("uncommitted")
+        (initialized_repo / "dirty.txt").write_text("uncommitted")
 
         result = runner.invoke(app, ["submit"])
 
         assert result.exit_code != 0
         assert "clean" in result.stdout.lower() or "uncommitted" in result.stdout.lower()
 
-    def test_fails_if_not_authenticated(self, temp_git_repo: Path, mocker) -> None:
+    def test_fails_if_not_authenticated(self, repo_with_feature: Path, mocker) -> None:
         """Fails if GitHub CLI is not authenticated."""
-        runner.invoke(app, ["init"])
-        runner.invoke(app, ["create", "feature"])
-
         # Mock gh auth to fail
         mocker.patch("gstack.gh_ops.is_gh_authenticated", return_value=False)
 
@@ -331,10 +312,8 @@ class TestSubmitCommand:
         assert result.exit_code != 0
         assert "authenticated" in result.stdout.lower() or "gh auth" in result.stdout.lower()
 
-    def test_noop_when_no_branches(self, temp_git_repo: Path, mocker) -> None:
+    def test_noop_when_no_branches(self, initialized_repo: Path, mocker) -> None:
         """No-op when no stacked branches exist."""
-        runner.invoke(app, ["init"])
-
         # Mock gh auth to succeed
         mocker.patch("gstack.gh_ops.is_gh_authenticated", return_value=True)
 
@@ -347,6 +326,27 @@ class TestSubmitCommand:
 class TestGitPassthrough:
     """Tests for git command passthrough functionality."""
 
+    def test_every_command_is_recognized(self) -> None:
+        """Every registered command is routed to gstack, not passed to git."""
+        from gstack.cli import COMMANDS
+        from gstack.main import GSTACK_COMMANDS
+
+        assert set(COMMANDS) <= GSTACK_COMMANDS
+
+    def test_entry_module_imports_no_dependencies(self) -> None:
+        """Deciding on pass-through doesn't import typer or pydantic."""
+        import sys
+
+        code = (
+            "import sys, gstack.main; "
+            "print(any(m in sys.modules for m in ('typer', 'pydantic', 'gstack.cli')))"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code], check=True, capture_output=True, text=True
+        )
+
+        assert result.stdout.strip() == "False"
+
     def test_passthrough_preserves_m_flag(self, temp_git_repo: Path, mocker) -> None:
         """Git passthrough preserves -m flag with message argument."""
         from gstack.main import main
@@ -382,16 +382,15 @@ class TestGitPassthrough:
             call_args = mock_run.call_args
             assert call_args[0][0] == ["git", "commit", "-m", "test message"]
 
-    def test_passthrough_preserves_multiple_flags(self, temp_git_repo: Path, mocker) -> None:
+    def test_passthrough_preserves_multiple_flags(
+        self, temp_git_repo: Path, mocker, mock_subprocess
+    ) -> None:
         """Git passthrough preserves multiple flags like -u -p."""
         from gstack.main import main
 
         # Mock sys.argv to simulate `gs add -u -p`
         mocker.patch("sys.argv", ["gs", "add", "-u", "-p"])
 
-        mock_run = mocker.patch("subprocess.run")
-        mock_run.return_value = subprocess.CompletedProcess(args=[], returncode=0)
-
         mock_execvp = mocker.patch("os.execvp")
 
         try:
@@ -404,18 +403,17 @@ class TestGitPassthrough:
             assert call_args[0][0] == "git"
             assert call_args[0][1] == ["git", "add", "-u", "-p"]
         else:
-            call_args = mock_run.call_args
+            call_args = mock_subprocess.call_args
             assert call_args[0][0] == ["git", "add", "-u", "-p"]
 
-    def test_passthrough_unknown_command_goes_to_git(self, temp_git_repo: Path, mocker) -> None:
+    def test_passthrough_unknown_command_goes_to_git(
+        self, temp_git_repo: Path, mocker, mock_subprocess
+    ) -> None:
         """Unknown commands are passed through to git, not handled by gstack."""
         from gstack.main import main
 
         mocker.patch("sys.argv", ["gs", "status"])
 
-        mock_run = mocker.patch("subprocess.run")
-        mock_run.return_value = subprocess.CompletedProcess(args=[], returncode=0)
-
         mock_execvp = mocker.patch("os.execvp")
 
         try:
@@ -429,18 +427,18 @@ class TestGitPassthrough:
             assert call_args[0][0] == "git"
             assert "status" in call_args[0][1]
         else:
-            call_args = mock_run.call_args
+            call_args = mock_subprocess.call_args
             assert call_args[0][0] == ["git", "status"]
 
-    def test_known_commands_not_passed_to_git(self, temp_git_repo: Path, mocker) -> None:
+    def test_known_commands_not_passed_to_git(
+        self, temp_git_repo: Path, mocker, mock_subprocess
+    ) -> None:
         """Known gstack commands should not be passed to git."""
         from gstack.main import main
 
         # Test that init is handled by gstack, not passed to git
         mocker.patch("sys.argv", ["gs", "init"])
 
-        mock_run = mocker.patch("subprocess.run")
-
         # This should call the typer app, not git
         # We don't need to assert here - just verify git wasn't called
         try:
@@ -450,7 +448,7 @@ class TestGitPassthrough:
 
         # If subprocess.run was called, it should NOT be for "git init"
         # (it might be called internally by gstack operations)
-        for call in mock_run.call_args_list:
+        for call in mock_subprocess.call_args_list:
             args = call[0][0] if call[0] else []
             if args and args[0] == "git":
                 # Git might be called for internal operations, but not as passthrough
@@ -460,10 +458,8 @@ class TestGitPassthrough:
 class TestMoveCommand:
     """Tests for the move command."""
 
-    def test_move_changes_parent(self, temp_git_repo: Path, mocker) -> None:
+    def test_move_changes_parent(self, repo_with_feature: Path, mocker) -> None:
         """Move changes branch parent in config."""
-        runner.invoke(app, ["init"])
-        runner.invoke(app, ["create", "feature"])
         runner.invoke(app, ["create", "feature-ui"])  # feature-ui -> feature
         subprocess.run(["git", "checkout", "main"], check=True, capture_output=True)
         runner.invoke(app, ["create", "other"])  # other -> main
@@ -476,13 +472,11 @@ class TestMoveCommand:
         result = runner.invoke(app, ["move", "feature-ui", "--onto", "main"])
 
         assert result.exit_code == 0
-        config = stack_manager.load_config(temp_git_repo)
+        config = stack_manager.load_config(repo_with_feature)
         assert config.branches["feature-ui"].parent == "main"
 
-    def test_move_updates_children_lists(self, temp_git_repo: Path, mocker) -> None:
+    def test_move_updates_children_lists(self, repo_with_feature: Path, mocker) -> None:
         """Move updates old and new parent's children lists."""
-        runner.invoke(app, ["init"])
-        runner.invoke(app, ["create", "feature"])
         runner.invoke(app, ["create", "feature-ui"])  # feature-ui -> feature
         subprocess.run(["git", "checkout", "main"], check=True, capture_output=True)
 
@@ -493,27 +487,23 @@ class TestMoveCommand:
         result = runner.invoke(app, ["move", "feature-ui", "--onto", "main"])
 
         assert result.exit_code == 0
-        config = stack_manager.load_config(temp_git_repo)
+        config = stack_manager.load_config(repo_with_feature)
         # feature-ui should be removed from feature's children
         assert "feature-ui" not in config.branches["feature"].children
         # feature-ui's parent should be main
         assert config.branches["feature-ui"].parent == "main"
 
-    def test_move_fails_if_branch_not_tracked(self, temp_git_repo: Path, mocker) -> None:
+    def test_move_fails_if_branch_not_tracked(self, initialized_repo: Path, mocker) -> None:
         """Move fails if branch is not tracked by gstack."""
-        runner.invoke(app, ["init"])
-        subprocess.run(["git", "checkout", "-b", "untracked"], check=True, capture_output=True)
-        subprocess.run(["git", "checkout", "main"], check=True, capture_output=True)
+        subprocess.run(["git", "branch", "untracked"], check=True, capture_output=True)
 
         result = runner.invoke(app, ["move", "untracked", "--onto", "main"])
 
         assert result.exit_code != 0
         assert "not tracked" in result.stdout.lower()
 
-    def test_move_fails_if_new_parent_not_exists(self, temp_git_repo: Path, mocker) -> None:
+    def test_move_fails_if_new_parent_not_exists(self, repo_with_feature: Path, mocker) -> None:
         """Move fails if new parent branch doesn't exist."""
-        runner.invoke(app, ["init"])
-        runner.invoke(app, ["create", "feature"])
         subprocess.run(["git", "checkout", "main"], check=True, capture_output=True)
 
         result = runner.invoke(app, ["move", "feature", "--onto", "nonexistent"])
@@ -528,9 +518,8 @@ class TestMoveCommand:
         assert result.exit_code != 0
         assert "not initialized" in result.stdout.lower() or "init" in result.stdout.lower()
 
-    def test_move_noop_if_same_parent(self, temp_git_repo: Path, mocker) -> None:
+    def test_move_noop_if_same_parent(self, initialized_repo: Path, mocker) -> None:
         """Move is a no-op if branch is already on the specified parent."""
-        runner.invoke(app, ["init"])
         runner.invoke(app, ["create", "feature"])  # feature -> main
         subprocess.run(["git", "checkout", "main"], check=True, capture_output=True)
 
@@ -540,3 +529,32 @@ class TestMoveCommand:
 
         assert result.exit_code == 0
         assert "already" in result.stdout.lower()
+
+
+class TestBuildApp:
+    """Tests for per-command app construction."""
+
+    def test_registers_only_requested_command(self) -> None:
+        """Only the command about to run is registered."""
+        from gstack.cli import build_app
+
+        single = build_app("log")
+
+        assert [c.name for c in single.registered_commands] == ["log"]
+
+    def test_registers_all_commands_for_help(self) -> None:
+        """--help (or no command) registers every command."""
+        from gstack.cli import COMMANDS, build_app
+
+        full = build_app("--help")
+
+        assert [c.name for c in full.registered_commands] == list(COMMANDS)
+
+    def test_single_command_app_runs_command(self, temp_git_repo: Path) -> None:
+        """A single-command app still parses `gstack <command> ...`."""
+        from gstack.cli import build_app
+
+        result = runner.invoke(build_app("init"), ["init", "--trunk", "main"])
+
+        assert result.exit_code == 0
+        assert stack_manager.load_config(temp_git_repo).trunk == "main"
@@ -1,94 +1,107 @@
 """Tests for GitHub CLI operations wrapper."""
 
 import json
+import re
 import subprocess
+from types import SimpleNamespace
 
 import pytest
 
 from gstack import gh_ops
 from gstack.exceptions import GhError, GhNotAuthenticatedError
+from gstack.models import BranchInfo
+
+
+def _cp(returncode: int = 0, stdout: str = "", stderr: str = "") -> SimpleNamespace:
+    """Build a stand-in for the subprocess.CompletedProcess that run_gh reads."""
+    return SimpleNamespace(returncode=returncode, stdout=stdout, stderr=stderr, args=())
 
 
 class TestRunGh:
     """Tests for the run_gh wrapper function."""
 
-    def test_captures_stdout(self, mocker) -> None:
+    def test_captures_stdout(self, mock_subprocess) -> None:
         """Output is captured correctly."""
-        mock_run = mocker.patch("subprocess.run")
-        mock_run.return_value = subprocess.CompletedProcess(
-            args=["gh", "auth", "status"],
-            returncode=0,
-            stdout="Logged in to github.com",
-            stderr="",
-        )
+        mock_subprocess.return_value = _cp(stdout="Logged in to github.com")
 
         result = gh_ops.run_gh("auth", "status")
         assert result.stdout == "Logged in to github.com"
 
-    def test_raises_on_failure(self, mocker) -> None:
+    def test_raises_on_failure(self, mock_subprocess) -> None:
         """GhError raised on non-zero exit."""
-        mock_run = mocker.patch("subprocess.run")
-        mock_run.return_value = subprocess.CompletedProcess(
-            args=["gh", "pr", "view"],
-            returncode=1,
-            stdout="",
-            stderr="no pull request found",
-        )
+        mock_subprocess.return_value = _cp(returncode=1, stderr="no pull request found")
 
         with pytest.raises(GhError):
             gh_ops.run_gh("pr", "view")
 
-    def test_check_false_does_not_raise(self, mocker) -> None:
+    def test_check_false_does_not_raise(self, mock_subprocess) -> None:
         """With check=False, no exception is raised on failure."""
-        mock_run = mocker.patch("subprocess.run")
-        mock_run.return_value = subprocess.CompletedProcess(
-            args=["gh", "pr", "view"],
-            returncode=1,
-            stdout="",
-            stderr="no pull request found",
-        )
+        mock_subprocess.return_value = _cp(returncode=1, stderr="no pull request found")
 
         result = gh_ops.run_gh("pr", "view", check=False)
         assert result.returncode == 1
 
 
+class TestRunGhReturncode:
+    """Tests for run_gh_returncode."""
+
+    def test_discards_output(self, mock_subprocess) -> None:
+        """Output is sent to DEVNULL rather than captured."""
+        mock_subprocess.return_value = _cp()
+
+        assert gh_ops.run_gh_returncode("auth", "status") == 0
+        kwargs = mock_subprocess.call_args[1]
+        assert kwargs["stdout"] is subprocess.DEVNULL
+        assert kwargs["stderr"] is subprocess.DEVNULL
+
+
+class TestIsGhInstalled:
+    """Tests for is_gh_installed."""
+
+    def test_looks_up_gh_once(self, mocker) -> None:
+        """Resolves gh on PATH once and reuses the answer."""
+        mocker.patch.object(gh_ops, "_gh_installed", None)
+        mock_which = mocker.patch("shutil.which", return_value=None)
+
+        assert gh_ops.is_gh_installed() is False
+        assert gh_ops.is_gh_installed() is False
+        mock_which.assert_called_once_with("gh")
+
+
 class TestIsGhAuthenticated:
     """Tests for is_gh_authenticated."""
 
-    def test_returns_true_when_authenticated(self, mocker) -> None:
+    def test_returns_true_when_authenticated(self, mock_subprocess) -> None:
         """Returns True when gh auth status succeeds."""
-        mock_run = mocker.patch("subprocess.run")
-        mock_run.return_value = subprocess.CompletedProcess(
-            args=["gh", "auth", "status"],
-            returncode=0,
-            stdout="Logged in to github.com as user",
-            stderr="",
-        )
+        mock_subprocess.return_value = _cp(stdout="Logged in to github.com as user")
 
         assert gh_ops.is_gh_authenticated() is True
 
-    def test_returns_false_when_not_authenticated(self, mocker) -> None:
+    def test_returns_false_when_not_authenticated(self, mock_subprocess) -> None:
         """Returns False when gh auth status fails."""
-        mock_run = mocker.patch("subprocess.run")
-        mock_run.return_value = subprocess.CompletedProcess(
-            args=["gh", "auth", "status"],
-            returncode=1,
-            stdout="",
-            stderr="You are not logged in",
-        )
+        mock_subprocess.return_value = _cp(returncode=1, stderr="You are not logged in")
 
         assert gh_ops.is_gh_authenticated() is False
 
+    def test_remembers_success(self, mock_subprocess) -> None:
+        """A successful check isn't repeated; a failed one is."""
+        mock_subprocess.side_effect = [
+            _cp(returncode=1),
+            _cp(),
+        ]
+
+        assert gh_ops.is_gh_authenticated() is False
+        assert gh_ops.is_gh_authenticated() is True
+        assert gh_ops.is_gh_authenticated() is True
+        assert mock_subprocess.call_count == 2
+
 
 class TestGetPrInfo:
     """Tests for get_pr_info."""
 
-    def test_returns_pr_info(self, mocker) -> None:
+    def test_returns_pr_info(self, mock_subprocess) -> None:
         """Returns PR info when PR exists."""
-        mock_run = mocker.patch("subprocess.run")
-        mock_run.return_value = subprocess.CompletedProcess(
-            args=["gh", "pr", "view"],
-            returncode=0,
+        mock_subprocess.return_value = _cp(
             stdout=json.dumps(
                 {
                     "url": "https://github.com/org/repo/pull/1",
@@ -96,8 +109,7 @@ class TestGetPrInfo:
                     "state": "OPEN",
                     "number": 1,
                 }
-            ),
-            stderr="",
+            )
         )
 
         info = gh_ops.get_pr_info("feature")
@@ -108,33 +120,159 @@ class TestGetPrInfo:
         assert info.state == "OPEN"
         assert info.number == 1
 
-    def test_returns_none_when_no_pr(self, mocker) -> None:
+    def test_returns_none_when_no_pr(self, mock_subprocess) -> None:
         """Returns None when PR doesn't exist."""
-        mock_run = mocker.patch("subprocess.run")
-        mock_run.return_value = subprocess.CompletedProcess(
-            args=["gh", "pr", "view"],
-            returncode=1,
-            stdout="",
-            stderr="no pull requests found for branch",
-        )
+        mock_subprocess.return_value = _cp(returncode=1, stderr="no pull requests found for branch")
+
+        info = gh_ops.get_pr_info("feature")
+        assert info is None
+
+    def test_returns_none_on_invalid_json(self, mock_subprocess) -> None:
+        """Returns None when gh output is not valid JSON."""
+        mock_subprocess.return_value = _cp(stdout="not json")
 
         info = gh_ops.get_pr_info("feature")
         assert info is None
 
 
+class TestGetPrInfos:
+    """Tests for get_pr_infos."""
+
+    def test_looks_up_each_branch(self, mocker) -> None:
+        """Returns a dict with one entry per branch."""
+        info = gh_ops.PrInfo(
+            url="https://github.com/org/repo/pull/1", base="main", state="OPEN", number=1
+        )
+        mocker.patch(
+            "gstack.gh_ops.get_pr_info",
+            side_effect=lambda branch: info if branch == "feature" else None,
+        )
+
+        infos = gh_ops.get_pr_infos(["feature", "feature-ui"])
+
+        assert infos == {"feature": info, "feature-ui": None}
+
+    def test_looks_up_branches_concurrently(self, mocker) -> None:
+        """Lookups overlap instead of running one after another."""
+        import threading
+
+        # Every lookup waits for all the others; serial lookups would time out
+        branches = ["a", "b", "c"]
+        barrier = threading.Barrier(len(branches), timeout=5)
+
+        def lookup(branch: str) -> None:
+            barrier.wait()
+            return None
+
+        mock_get = mocker.patch("gstack.gh_ops.get_pr_info", side_effect=lookup)
+
+        assert gh_ops.get_pr_infos(branches) == dict.fromkeys(branches)
+        assert mock_get.call_count == len(branches)
+
+    def test_empty_for_no_branches(self, mocker) -> None:
+        """Does not call gh when there are no branches."""
+        mock_get = mocker.patch("gstack.gh_ops.get_pr_info")
+
+        assert gh_ops.get_pr_infos([]) == {}
+        mock_get.assert_not_called()
+
+
+class TestGetAllPrInfos:
+    """Tests for get_all_pr_infos."""
+
+    def test_returns_infos_in_single_call(self, mock_subprocess) -> None:
+        """Looks up all branches with one gh invocation."""
+        mock_subprocess.return_value = _cp(
+            stdout=json.dumps(
+                {
+                    "data": {
+                        "repository": {
+                            "owner": {"login": "org"},
+                            "b0": {
+                                "nodes": [
+                                    {
+                                        "headRepositoryOwner": {"login": "org"},
+                                        "url": "https://github.com/org/repo/pull/1",
+                                        "baseRefName": "main",
+                                        "state": "MERGED",
+                                        "number": 1,
+                                    }
+                                ]
+                            },
+                            "b1": {"nodes": []},
+                        }
+                    }
+                }
+            )
+        )
+
+        infos = gh_ops.get_all_pr_infos(["feature", "feature-ui"])
+
+        assert mock_subprocess.call_count == 1
+        assert set(infos) == {"feature"}
+        assert infos["feature"].state == "MERGED"
+        assert infos["feature"].number == 1
+        call_args = mock_subprocess.call_args[0][0]
+        assert "h0=feature" in call_args
+        assert "h1=feature-ui" in call_args
+
+    def test_prefers_open_pr_from_this_repo(self, mock_subprocess) -> None:
+        """Skips fork PRs and prefers an open PR over a newer closed one."""
+
+        def node(number: int, state: str, owner: str) -> dict:
+            return {
+                "headRepositoryOwner": {"login": owner},
+                "url": f"https://github.com/org/repo/pull/{number}",
+                "baseRefName": "main",
+                "state": state,
+                "number": number,
+            }
+
+        mock_subprocess.return_value = _cp(
+            stdout=json.dumps(
+                {
+                    "data": {
+                        "repository": {
+                            "owner": {"login": "Org"},
+                            "b0": {
+                                "nodes": [
+                                    node(9, "OPEN", "someone"),
+                                    node(8, "CLOSED", "org"),
+                                    node(5, "OPEN", "org"),
+                                ]
+                            },
+                            "b1": {"nodes": [node(7, "OPEN", "someone")]},
+                        }
+                    }
+                }
+            )
+        )
+
+        infos = gh_ops.get_all_pr_infos(["feature", "feature-ui"])
+
+        assert set(infos) == {"feature"}
+        assert infos["feature"].number == 5
+
+    def test_empty_for_no_branches(self, mock_subprocess) -> None:
+        """Does not call gh when there are no branches."""
+
+        assert gh_ops.get_all_pr_infos([]) == {}
+        mock_subprocess.assert_not_called()
+
+    def test_empty_on_failure(self, mock_subprocess) -> None:
+        """Returns empty dict when the query fails."""
+        mock_subprocess.return_value = _cp(returncode=1, stderr="HTTP 401")
+
+        assert gh_ops.get_all_pr_infos(["feature"]) == {}
+
+
 class TestCreatePr:
     """Tests for create_pr."""
 
-    def test_creates_pr(self, mocker) -> None:
+    def test_creates_pr(self, mock_subprocess) -> None:
         """Creates PR with correct arguments."""
-        mock_run = mocker.patch("subprocess.run")
         # gh pr create outputs the URL directly, not JSON
-        mock_run.return_value = subprocess.CompletedProcess(
-            args=["gh", "pr", "create"],
-            returncode=0,
-            stdout="https://github.com/org/repo/pull/1\n",
-            stderr="",
-        )
+        mock_subprocess.return_value = _cp(stdout="https://github.com/org/repo/pull/1\n")
 
         result = gh_ops.create_pr(
             head="feature",
@@ -146,7 +284,7 @@ class TestCreatePr:
         assert result.url == "https://github.com/org/repo/pull/1"
         assert result.number == 1
         # Verify the command was called correctly
-        call_args = mock_run.call_args[0][0]
+        call_args = mock_subprocess.call_args[0][0]
         assert "pr" in call_args
         assert "create" in call_args
         assert "--head" in call_args
@@ -156,69 +294,53 @@ class TestCreatePr:
         # Should NOT have --json flag
         assert "--json" not in call_args
 
-    def test_creates_pr_with_defaults(self, mocker) -> None:
+    def test_creates_pr_with_defaults(self, mock_subprocess) -> None:
         """Creates PR with default title/body."""
-        mock_run = mocker.patch("subprocess.run")
         # gh pr create outputs the URL directly, not JSON
-        mock_run.return_value = subprocess.CompletedProcess(
-            args=["gh", "pr", "create"],
-            returncode=0,
-            stdout="https://github.com/org/repo/pull/42\n",
-            stderr="",
-        )
+        mock_subprocess.return_value = _cp(stdout="https://github.com/org/repo/pull/42\n")
 
         result = gh_ops.create_pr(head="feature", base="main")
         assert result.url == "https://github.com/org/repo/pull/42"
         assert result.number == 42
 
-    def test_does_not_use_json_flag(self, mocker) -> None:
+    def test_does_not_use_json_flag(self, mock_subprocess) -> None:
         """gh pr create does not support --json flag."""
-        mock_run = mocker.patch("subprocess.run")
-        mock_run.return_value = subprocess.CompletedProcess(
-            args=["gh", "pr", "create"],
-            returncode=0,
-            stdout="https://github.com/org/repo/pull/42\n",
-            stderr="",
-        )
+        mock_subprocess.return_value = _cp(stdout="https://github.com/org/repo/pull/42\n")
 
         gh_ops.create_pr(head="feature", base="main")
 
         # Verify --json is NOT in the command args
-        call_args = mock_run.call_args[0][0]
+        call_args = mock_subprocess.call_args[0][0]
         assert "--json" not in call_args, "gh pr create does not support --json flag"
 
-    def test_extracts_pr_number_from_url(self, mocker) -> None:
+    def test_extracts_pr_number_from_url(self, mock_subprocess) -> None:
         """PR number is extracted from the URL."""
-        mock_run = mocker.patch("subprocess.run")
-        mock_run.return_value = subprocess.CompletedProcess(
-            args=["gh", "pr", "create"],
-            returncode=0,
-            stdout="https://github.com/org/repo/pull/42\n",
-            stderr="",
-        )
+        mock_subprocess.return_value = _cp(stdout="https://github.com/org/repo/pull/42\n")
 
         result = gh_ops.create_pr(head="feature", base="main")
 
         assert result.number == 42
         assert result.url == "https://github.com/org/repo/pull/42"
 
+    def test_number_zero_when_url_has_no_number(self, mock_subprocess) -> None:
+        """PR number falls back to 0 if the output does not end in a number."""
+        mock_subprocess.return_value = _cp(stdout="https://github.com/org/repo/pull/\n")
+
+        result = gh_ops.create_pr(head="feature", base="main")
+
+        assert result.number == 0
+
 
 class TestUpdatePrBase:
     """Tests for update_pr_base."""
 
-    def test_updates_pr_base(self, mocker) -> None:
+    def test_updates_pr_base(self, mock_subprocess) -> None:
         """Updates PR base branch."""
-        mock_run = mocker.patch("subprocess.run")
-        mock_run.return_value = subprocess.CompletedProcess(
-            args=["gh", "pr", "edit"],
-            returncode=0,
-            stdout="",
-            stderr="",
-        )
+        mock_subprocess.return_value = _cp()
 
         gh_ops.update_pr_base("feature", new_base="develop")
 
-        call_args = mock_run.call_args[0][0]
+        call_args = mock_subprocess.call_args[0][0]
         assert "pr" in call_args
         assert "edit" in call_args
         assert "--base" in call_args
@@ -228,93 +350,302 @@ class TestUpdatePrBase:
 class TestIsPrMerged:
     """Tests for is_pr_merged."""
 
-    def test_returns_true_when_merged(self, mocker) -> None:
-        """Returns True when PR state is MERGED."""
-        mock_run = mocker.patch("subprocess.run")
-        mock_run.return_value = subprocess.CompletedProcess(
-            args=["gh", "pr", "view"],
-            returncode=0,
-            stdout=json.dumps(
-                {
-                    "url": "https://github.com/org/repo/pull/1",
-                    "baseRefName": "main",
-                    "state": "MERGED",
-                    "number": 1,
-                }
-            ),
-            stderr="",
-        )
+    @pytest.mark.parametrize(
+        ("returncode", "stdout", "expected"),
+        [(0, "MERGED\n", True), (0, "OPEN\n", False), (1, "", False)],
+        ids=["merged", "open", "no-pr"],
+    )
+    def test_reports_merged_state(
+        self, mock_subprocess, returncode: int, stdout: str, expected: bool
+    ) -> None:
+        """True only when gh reports the PR state as MERGED."""
+        mock_subprocess.return_value = _cp(returncode=returncode, stdout=stdout)
 
-        assert gh_ops.is_pr_merged("feature") is True
+        assert gh_ops.is_pr_merged("feature") is expected
 
-    def test_returns_false_when_open(self, mocker) -> None:
-        """Returns False when PR state is OPEN."""
-        mock_run = mocker.patch("subprocess.run")
-        mock_run.return_value = subprocess.CompletedProcess(
-            args=["gh", "pr", "view"],
-            returncode=0,
-            stdout=json.dumps(
-                {
-                    "url": "https://github.com/org/repo/pull/1",
-                    "baseRefName": "main",
-                    "state": "OPEN",
-                    "number": 1,
-                }
-            ),
-            stderr="",
-        )
+    def test_requests_only_state(self, mock_subprocess) -> None:
+        """Asks gh for just the state field, printed bare, in one call."""
+        mock_subprocess.return_value = _cp(stdout="MERGED\n")
 
-        assert gh_ops.is_pr_merged("feature") is False
+        gh_ops.is_pr_merged("feature")
 
-    def test_returns_false_when_no_pr(self, mocker) -> None:
-        """Returns False when no PR exists."""
-        mock_run = mocker.patch("subprocess.run")
-        mock_run.return_value = subprocess.CompletedProcess(
-            args=["gh", "pr", "view"],
-            returncode=1,
-            stdout="",
-            stderr="no pull requests found",
-        )
-
-        assert gh_ops.is_pr_merged("feature") is False
+        assert mock_subprocess.call_count == 1
+        args = mock_subprocess.call_args[0][0]
+        assert args[args.index("--json") + 1] == "state"
+        assert args[args.index("--jq") + 1] == ".state"
 
 
 class TestRequireGhAuth:
     """Tests for require_gh_auth."""
 
-    def test_passes_when_authenticated(self, mocker) -> None:
+    def test_passes_when_authenticated(self, mock_subprocess) -> None:
         """Does not raise when authenticated."""
-        mock_run = mocker.patch("subprocess.run")
-        mock_run.return_value = subprocess.CompletedProcess(
-            args=["gh", "auth", "status"],
-            returncode=0,
-            stdout="Logged in",
-            stderr="",
-        )
+        mock_subprocess.return_value = _cp(stdout="Logged in")
 
         gh_ops.require_gh_auth()  # Should not raise
 
-    def test_raises_when_not_authenticated(self, mocker) -> None:
+    def test_raises_when_not_authenticated(self, mock_subprocess) -> None:
         """Raises GhNotAuthenticatedError when not authenticated."""
-        mock_run = mocker.patch("subprocess.run")
-        mock_run.return_value = subprocess.CompletedProcess(
-            args=["gh", "auth", "status"],
-            returncode=1,
-            stdout="",
-            stderr="You are not logged in",
-        )
+        mock_subprocess.return_value = _cp(returncode=1, stderr="You are not logged in")
 
         with pytest.raises(GhNotAuthenticatedError):
             gh_ops.require_gh_auth()
 
 
+class TestAddOrUpdateStackComment:
+    """Tests for add_or_update_stack_comment."""
+
+    def test_updates_existing_comment(self, mock_subprocess) -> None:
+        """Updates the comment whose node id gh's jq filter returned via GraphQL."""
+        mock_subprocess.return_value = _cp(stdout="IC_abc123\n")
+
+        gh_ops.add_or_update_stack_comment("feature", "body")
+
+        view_args = mock_subprocess.call_args_list[0][0][0]
+        assert "--jq" in view_args
+        update_args = mock_subprocess.call_args_list[1][0][0]
+        assert update_args[:3] == ["gh", "api", "graphql"]
+        query = next(a for a in update_args if a.startswith("query="))
+        assert "c0: updateIssueComment" in query
+        assert "n0=IC_abc123" in update_args
+        assert not any("/issues/comments/" in a for a in update_args)
+
+    def test_creates_comment_when_none_exists(self, mock_subprocess) -> None:
+        """Creates a new comment when no gstack comment is found."""
+        mock_subprocess.return_value = _cp()
+
+        gh_ops.add_or_update_stack_comment("feature", "body")
+
+        create_args = mock_subprocess.call_args_list[1][0][0]
+        assert create_args[:3] == ["gh", "pr", "comment"]
+
+    def test_noop_when_no_pr(self, mock_subprocess) -> None:
+        """Does nothing else when the branch has no PR."""
+        mock_subprocess.return_value = _cp(returncode=1, stderr="no pull requests found")
+
+        gh_ops.add_or_update_stack_comment("feature", "body")
+
+        assert mock_subprocess.call_count == 1
+
+
+class TestAddOrUpdateStackComments:
+    """Tests for add_or_update_stack_comments."""
+
+    def test_updates_and_adds_comments_in_one_mutation(self, mock_subprocess) -> None:
+        """Looks up every PR at once, then updates or adds in a single mutation."""
+        lookup = json.dumps(
+            {
+                "data": {
+                    "repository": {
+                        "owner": {"login": "org"},
+                        "b0": {
+                            "nodes": [
+                                {
+                                    "state": "OPEN",
+                                    "headRepositoryOwner": {"login": "org"},
+                                    "id": "PR_1",
+                                    "comments": {
+                                        "nodes": [
+                                            {"id": "IC_other", "body": "LGTM"},
+                                            {
+                                                "id": "IC_stack",
+                                                "body": f"{gh_ops.STACK_COMMENT_MARKER}\nold",
+                                            },
+                                        ],
+                                        "pageInfo": {"hasNextPage": False},
+                                    },
+                                }
+                            ]
+                        },
+                        "b1": {
+                            "nodes": [
+                                {
+                                    "state": "OPEN",
+                                    "headRepositoryOwner": {"login": "org"},
+                                    "id": "PR_2",
+                                    "comments": {"nodes": [], "pageInfo": {"hasNextPage": False}},
+                                }
+                            ]
+                        },
+                        "b2": {"nodes": []},
+                    }
+                }
+            }
+        )
+        mock_subprocess.side_effect = [
+            _cp(stdout=lookup),
+            _cp(stdout="{}"),
+        ]
+
+        posted = gh_ops.add_or_update_stack_comments(["feature", "feature-ui", "no-pr"], "body")
+
+        assert posted == ["feature", "feature-ui"]
+        assert mock_subprocess.call_count == 2
+        mutation_args = mock_subprocess.call_args_list[1][0][0]
+        query = next(a for a in mutation_args if a.startswith("query="))
+        assert "c0: updateIssueComment" in query
+        assert "c1: addComment" in query
+        assert "n0=IC_stack" in mutation_args
+        assert "n1=PR_2" in mutation_args
+        assert "body=body" in mutation_args
+
+    def test_retries_only_failed_fields(self, mock_subprocess) -> None:
+        """A partially failed mutation retries just the PRs whose field failed."""
+        lookup = json.dumps(
+            {
+                "data": {
+                    "repository": {
+                        "owner": {"login": "org"},
+                        "b0": {
+                            "nodes": [
+                                {
+                                    "state": "OPEN",
+                                    "headRepositoryOwner": {"login": "org"},
+                                    "id": "PR_1",
+                                    "comments": {"nodes": [], "pageInfo": {"hasNextPage": False}},
+                                }
+                            ]
+                        },
+                        "b1": {
+                            "nodes": [
+                                {
+                                    "state": "OPEN",
+                                    "headRepositoryOwner": {"login": "org"},
+                                    "id": "PR_2",
+                                    "comments": {"nodes": [], "pageInfo": {"hasNextPage": False}},
+                                }
+                            ]
+                        },
+                    }
+                }
+            }
+        )
+        partial = json.dumps(
+            {
+                "data": {"c0": {"clientMutationId": None}, "c1": None},
+                "errors": [{"path": ["c1"], "message": "Resource not accessible"}],
+            }
+        )
+        mock_subprocess.side_effect = [
+            _cp(stdout=lookup),
+            _cp(returncode=1, stdout=partial, stderr="gh: Resource not accessible"),
+            _cp(stdout="{}"),
+        ]
+
+        posted = gh_ops.add_or_update_stack_comments(["feature", "feature-ui"], "body")
+
+        assert posted == ["feature", "feature-ui"]
+        assert mock_subprocess.call_count == 3
+        retry_args = mock_subprocess.call_args_list[2][0][0]
+        assert "n0=PR_2" in retry_args
+        assert "c1:" not in next(a for a in retry_args if a.startswith("query="))
+
+    def test_leaves_out_prs_that_still_fail(self, mock_subprocess) -> None:
+        """A PR whose retry also fails isn't reported as posted."""
+        lookup = json.dumps(
+            {
+                "data": {
+                    "repository": {
+                        "owner": {"login": "org"},
+                        "b0": {
+                            "nodes": [
+                                {
+                                    "state": "OPEN",
+                                    "headRepositoryOwner": {"login": "org"},
+                                    "id": "PR_1",
+                                    "comments": {"nodes": [], "pageInfo": {"hasNextPage": False}},
+                                }
+                            ]
+                        },
+                        "b1": {
+                            "nodes": [
+                                {
+                                    "state": "OPEN",
+                                    "headRepositoryOwner": {"login": "org"},
+                                    "id": "PR_2",
+                                    "comments": {"nodes": [], "pageInfo": {"hasNextPage": False}},
+                                }
+                            ]
+                        },
+                    }
+                }
+            }
+        )
+        partial = json.dumps({"data": {"c0": {"clientMutationId": None}, "c1": None}})
+        mock_subprocess.side_effect = [
+            _cp(stdout=lookup),
+            _cp(returncode=1, stdout=partial),
+            _cp(returncode=1, stdout=json.dumps({"data": {"c0": None}})),
+        ]
+
+        assert gh_ops.add_or_update_stack_comments(["feature", "feature-ui"], "body") == ["feature"]
+
+    def test_searches_all_comments_when_first_page_misses(self, mock_subprocess) -> None:
+        """Falls back to gh pr view when the gstack comment may be past the first page."""
+        lookup = json.dumps(
+            {
+                "data": {
+                    "repository": {
+                        "owner": {"login": "org"},
+                        "b0": {
+                            "nodes": [
+                                {
+                                    "state": "OPEN",
+                                    "headRepositoryOwner": {"login": "org"},
+                                    "id": "PR_1",
+                                    "comments": {
+                                        "nodes": [{"id": "IC_other", "body": "LGTM"}],
+                                        "pageInfo": {"hasNextPage": True},
+                                    },
+                                }
+                            ]
+                        },
+                    }
+                }
+            }
+        )
+        mock_subprocess.side_effect = [
+            _cp(stdout=lookup),
+            _cp(stdout="IC_stack\n"),
+            _cp(stdout="{}"),
+        ]
+
+        assert gh_ops.add_or_update_stack_comments(["feature"], "body") == ["feature"]
+        view_args = mock_subprocess.call_args_list[1][0][0]
+        assert view_args[:4] == ["gh", "pr", "view", "feature"]
+        mutation_args = mock_subprocess.call_args_list[2][0][0]
+        assert "n0=IC_stack" in mutation_args
+
+    def test_no_mutation_when_no_prs(self, mock_subprocess) -> None:
+        """Stops after the lookup when none of the branches has a PR."""
+        mock_subprocess.return_value = _cp(
+            stdout=json.dumps(
+                {"data": {"repository": {"owner": {"login": "org"}, "b0": {"nodes": []}}}}
+            )
+        )
+
+        assert gh_ops.add_or_update_stack_comments(["feature"], "body") == []
+        assert mock_subprocess.call_count == 1
+
+
+@pytest.fixture(scope="module")
+def diagram_with_pr() -> str:
+    """Diagram for a single "feature" branch off main with an open PR (#42)."""
+    branches = {
+        "feature": BranchInfo(
+            parent="main",
+            children=[],
+            pr_url="https://github.com/org/repo/pull/42",
+        ),
+    }
+    return gh_ops.generate_stack_mermaid(branches, "main")
+
+
 class TestGenerateStackMermaid:
     """Tests for generate_stack_mermaid."""
 
     def test_generates_basic_diagram(self) -> None:
         """Generates a valid mermaid diagram."""
-        from gstack.models import BranchInfo
-
         branches = {
             "feature": BranchInfo(parent="main", children=["feature-ui"]),
             "feature-ui": BranchInfo(parent="feature", children=[]),
@@ -330,27 +661,13 @@ class TestGenerateStackMermaid:
         assert "main --> feature" in diagram
         assert "feature --> feature-ui" in diagram
 
-    def test_includes_pr_links(self) -> None:
+    def test_includes_pr_links(self, diagram_with_pr: str) -> None:
         """Includes PR links in node labels."""
-        from gstack.models import BranchInfo
-
-        branches = {
-            "feature": BranchInfo(
-                parent="main",
-                children=[],
-                pr_url="https://github.com/org/repo/pull/42",
-            ),
-        }
-
-        diagram = gh_ops.generate_stack_mermaid(branches, "main")
-
-        assert "#42" in diagram  # PR number in label
-        assert "https://github.com/org/repo/pull/42" in diagram
+        assert "#42" in diagram_with_pr  # PR number in label
+        assert "https://github.com/org/repo/pull/42" in diagram_with_pr
 
     def test_highlights_current_branch(self) -> None:
         """Highlights the current branch."""
-        from gstack.models import BranchInfo
-
         branches = {
             "feature": BranchInfo(parent="main", children=[]),
         }
@@ -361,8 +678,6 @@ class TestGenerateStackMermaid:
 
     def test_includes_marker(self) -> None:
         """Includes the gstack marker for updates."""
-        from gstack.models import BranchInfo
-
         branches = {
             "feature": BranchInfo(parent="main", children=[]),
         }
@@ -371,47 +686,21 @@ class TestGenerateStackMermaid:
 
         assert gh_ops.STACK_COMMENT_MARKER in diagram
 
-    def test_no_html_in_mermaid_nodes(self) -> None:
+    def test_no_html_in_mermaid_nodes(self, diagram_with_pr: str) -> None:
         """Mermaid nodes should not contain raw HTML tags that break parsing."""
-        from gstack.models import BranchInfo
-
-        branches = {
-            "feature": BranchInfo(
-                parent="main",
-                children=[],
-                pr_url="https://github.com/org/repo/pull/42",
-            ),
-        }
-
-        diagram = gh_ops.generate_stack_mermaid(branches, "main")
-
         # Should NOT contain HTML <a> tags inside node definitions
         # These break GitHub's mermaid parser
-        assert "<a href=" not in diagram
-        assert "</a>" not in diagram
+        assert "<a href=" not in diagram_with_pr
+        assert "</a>" not in diagram_with_pr
 
-    def test_uses_click_directive_for_links(self) -> None:
+    def test_uses_click_directive_for_links(self, diagram_with_pr: str) -> None:
         """PR links should use mermaid click directive, not HTML."""
-        from gstack.models import BranchInfo
-
-        branches = {
-            "feature": BranchInfo(
-                parent="main",
-                children=[],
-                pr_url="https://github.com/org/repo/pull/42",
-            ),
-        }
-
-        diagram = gh_ops.generate_stack_mermaid(branches, "main")
-
         # Should use mermaid's click directive for clickable nodes
-        assert "click feature" in diagram
-        assert "https://github.com/org/repo/pull/42" in diagram
+        assert "click feature" in diagram_with_pr
+        assert "https://github.com/org/repo/pull/42" in diagram_with_pr
 
     def test_valid_mermaid_syntax(self) -> None:
         """Generated mermaid should have valid syntax structure."""
-        from gstack.models import BranchInfo
-
         branches = {
             "feature": BranchInfo(
                 parent="main",
@@ -434,8 +723,6 @@ class TestGenerateStackMermaid:
 
     def test_no_nested_brackets_in_labels(self) -> None:
         """Mermaid labels must not have nested brackets like name[label [#6]]."""
-        from gstack.models import BranchInfo
-
         branches = {
             "feat_move_command": BranchInfo(
                 parent="main",
@@ -453,27 +740,10 @@ class TestGenerateStackMermaid:
         # Should use quoted labels instead: name["label #6"]
         assert '["' in diagram or "[" in diagram
 
-    def test_pr_label_uses_quoted_syntax(self) -> None:
+    def test_pr_label_uses_quoted_syntax(self, diagram_with_pr: str) -> None:
         """PR labels should use quoted mermaid syntax to avoid bracket issues."""
-        from gstack.models import BranchInfo
-
-        branches = {
-            "feature": BranchInfo(
-                parent="main",
-                children=[],
-                pr_url="https://github.com/org/repo/pull/42",
-            ),
-        }
-
-        diagram = gh_ops.generate_stack_mermaid(branches, "main")
-
         # Valid mermaid: feature["feature #42"]
         # Invalid mermaid: feature[feature [#42]]
-        lines = diagram.split("\n")
-        for line in lines:
-            # Check node definition lines (contain branch name and brackets)
-            if "feature[" in line and "#42" in line:
-                # Should be quoted: feature["..."]
-                assert '["' in line, f"Label should use quotes: {line}"
-                # Should NOT have nested unquoted brackets
-                assert "[#" not in line, f"Nested brackets break mermaid: {line}"
+        # The node line must exist and use exactly the quoted form
+        assert re.search(r'^\s*feature\["feature #42"\]$', diagram_with_pr, re.MULTILINE)
+        assert "[#" not in diagram_with_pr, "Nested brackets break mermaid"
@@ -9,20 +9,33 @@ from gstack import git_ops
 from gstack.exceptions import DirtyWorkdirError, GitError, NotAGitRepoError
 
 
+def git(*args: str) -> None:
+    """Run a setup git command in the current directory, discarding its output."""
+    subprocess.run(["git", *args], check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
 class TestRunGit:
     """Tests for the run_git wrapper function."""
 
-    def test_captures_stdout(self, temp_git_repo: Path) -> None:
+    def test_captures_stdout(self, mock_subprocess) -> None:
         """Output is captured correctly."""
+        mock_subprocess.return_value = subprocess.CompletedProcess(
+            args=[], returncode=0, stdout=" M README.md\n", stderr=""
+        )
+
         result = git_ops.run_git("status", "--porcelain")
-        assert isinstance(result.stdout, str)
+        assert result.stdout == " M README.md\n"
 
-    def test_captures_stderr(self, temp_git_repo: Path) -> None:
+    def test_captures_stderr(self, mock_subprocess) -> None:
         """Stderr is captured correctly."""
+        mock_subprocess.return_value = subprocess.CompletedProcess(
+            args=[], returncode=0, stdout="", stderr="warning: something\n"
+        )
+
         result = git_ops.run_git("status")
-        assert isinstance(result.stderr, str)
+        assert result.stderr == "warning: something\n"
 
-    def test_returns_returncode(self, temp_git_repo: Path) -> None:
+    def test_returns_returncode(self, mock_subprocess) -> None:
         """Return code is available."""
         result = git_ops.run_git("status")
         assert result.returncode == 0
@@ -38,6 +51,28 @@ class TestRunGit:
         result = git_ops.run_git("checkout", "nonexistent-branch", check=False)
         assert result.returncode != 0
 
+    def test_spawn_arguments_allow_posix_spawn(self, temp_git_repo: Path, mocker) -> None:
+        """git is run by absolute path with close_fds=False (posix_spawn fast path)."""
+        spy = mocker.spy(subprocess, "run")
+
+        git_ops.run_git("status")
+
+        cmd = spy.call_args[0][0]
+        assert Path(cmd[0]).is_absolute()
+        assert spy.call_args[1]["close_fds"] is False
+
+
+class TestRunGitReturncode:
+    """Tests for run_git_returncode."""
+
+    def test_zero_on_success(self, temp_git_repo: Path) -> None:
+        """Returns 0 when the command succeeds."""
+        assert git_ops.run_git_returncode("rev-parse", "HEAD") == 0
+
+    def test_nonzero_on_failure(self, temp_git_repo: Path) -> None:
+        """Returns a non-zero code instead of raising."""
+        assert git_ops.run_git_returncode("checkout", "nonexistent-branch") != 0
+
 
 class TestGetCurrentBranch:
     """Tests for get_current_branch."""
@@ -49,7 +84,7 @@ class TestGetCurrentBranch:
 
     def test_after_checkout(self, temp_git_repo: Path) -> None:
         """Returns correct branch after checkout."""
-        subprocess.run(["git", "checkout", "-b", "feature"], check=True, capture_output=True)
+        git("checkout", "-b", "feature")
         branch = git_ops.get_current_branch()
         assert branch == "feature"
 
@@ -74,9 +109,19 @@ class TestIsWorkdirClean:
     def test_false_with_staged_changes(self, temp_git_repo: Path) -> None:
         """Returns False when there are staged changes."""
         (temp_git_repo / "README.md").write_text("modified content")
-        subprocess.run(["git", "add", "README.md"], check=True, capture_output=True)
+        git("add", "README.md")
         assert git_ops.is_workdir_clean() is False
 
+    def test_true_after_touching_file(self, temp_git_repo: Path) -> None:
+        """A file whose mtime changed but content did not is not a change."""
+        import os
+        import time
+
+        readme = temp_git_repo / "README.md"
+        later = time.time() + 10
+        os.utime(readme, (later, later))
+        assert git_ops.is_workdir_clean() is True
+
 
 class TestRequireCleanWorkdir:
     """Tests for require_clean_workdir."""
@@ -100,55 +145,19 @@ class TestDetectTrunk:
         trunk = git_ops.detect_trunk()
         assert trunk == "main"
 
-    def test_returns_master_as_fallback(self, tmp_path: Path) -> None:
+    def test_returns_master_as_fallback(self, temp_git_repo: Path) -> None:
         """Returns 'master' when main doesn't exist but master does."""
-        import os
+        git("branch", "-m", "main", "master")
 
-        original_cwd = os.getcwd()
-        repo_path = tmp_path / "master_repo"
-        repo_path.mkdir()
-        os.chdir(repo_path)
-
-        try:
-            # Initialize with master as default branch
-            subprocess.run(["git", "init", "-b", "master"], check=True, capture_output=True)
-            subprocess.run(
-                ["git", "config", "user.email", "test@test.com"], check=True, capture_output=True
-            )
-            subprocess.run(["git", "config", "user.name", "Test"], check=True, capture_output=True)
-            Path("README.md").write_text("# Test\n")
-            subprocess.run(["git", "add", "."], check=True, capture_output=True)
-            subprocess.run(["git", "commit", "-m", "init"], check=True, capture_output=True)
-
-            trunk = git_ops.detect_trunk()
-            assert trunk == "master"
-        finally:
-            os.chdir(original_cwd)
-
-    def test_raises_when_neither_exists(self, tmp_path: Path) -> None:
-        """Raises GitError when neither main nor master exists."""
-        import os
-
-        original_cwd = os.getcwd()
-        repo_path = tmp_path / "custom_repo"
-        repo_path.mkdir()
-        os.chdir(repo_path)
+        trunk = git_ops.detect_trunk()
+        assert trunk == "master"
 
-        try:
-            # Initialize with custom branch name
-            subprocess.run(["git", "init", "-b", "develop"], check=True, capture_output=True)
-            subprocess.run(
-                ["git", "config", "user.email", "test@test.com"], check=True, capture_output=True
-            )
-            subprocess.run(["git", "config", "user.name", "Test"], check=True, capture_output=True)
-            Path("README.md").write_text("# Test\n")
-            subprocess.run(["git", "add", "."], check=True, capture_output=True)
-            subprocess.run(["git", "commit", "-m", "init"], check=True, capture_output=True)
+    def test_raises_when_neither_exists(self, temp_git_repo: Path) -> None:
+        """Raises GitError when neither main nor master exists."""
+        git("branch", "-m", "main", "develop")
 
-            with pytest.raises(GitError, match="Could not detect trunk branch"):
-                git_ops.detect_trunk()
-        finally:
-            os.chdir(original_cwd)
+        with pytest.raises(GitError, match="Could not detect trunk branch"):
+            git_ops.detect_trunk()
 
 
 class TestCheckoutBranch:
@@ -156,8 +165,7 @@ class TestCheckoutBranch:
 
     def test_switches_to_existing_branch(self, temp_git_repo: Path) -> None:
         """Can switch to an existing branch."""
-        subprocess.run(["git", "checkout", "-b", "feature"], check=True, capture_output=True)
-        subprocess.run(["git", "checkout", "main"], check=True, capture_output=True)
+        git("branch", "feature")
 
         git_ops.checkout_branch("feature")
         assert git_ops.get_current_branch() == "feature"
@@ -186,10 +194,37 @@ class TestBranchExists:
 
     def test_true_after_creating_branch(self, temp_git_repo: Path) -> None:
         """Returns True after creating a branch."""
-        subprocess.run(["git", "checkout", "-b", "feature"], check=True, capture_output=True)
+        git("checkout", "-b", "feature")
         assert git_ops.branch_exists("feature") is True
 
 
+class TestResolveRef:
+    """Tests for resolve_ref."""
+
+    def test_resolves_existing_branch(self, temp_git_repo: Path) -> None:
+        """Returns the commit SHA for an existing branch."""
+        head = subprocess.run(
+            ["git", "rev-parse", "HEAD"], check=True, capture_output=True, text=True
+        ).stdout.strip()
+        assert git_ops.resolve_ref("refs/heads/main") == head
+
+    def test_none_for_missing_ref(self, temp_git_repo: Path) -> None:
+        """Returns None when the ref does not exist."""
+        assert git_ops.resolve_ref("refs/heads/nonexistent") is None
+
+    def test_sees_refs_created_after_first_query(self, temp_git_repo: Path) -> None:
+        """Branches created after an earlier lookup are found."""
+        assert git_ops.resolve_ref("refs/heads/feature") is None
+        git("branch", "feature")
+        assert git_ops.resolve_ref("refs/heads/feature") is not None
+
+    def test_none_outside_repo(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Returns None when not inside a git repository."""
+        monkeypatch.chdir(tmp_path)
+
+        assert git_ops.resolve_ref("refs/heads/main") is None
+
+
 class TestIsAncestor:
     """Tests for is_ancestor."""
 
@@ -203,8 +238,8 @@ class TestIsAncestor:
 
         # Create child commit
         Path("file.txt").write_text("content")
-        subprocess.run(["git", "add", "file.txt"], check=True, capture_output=True)
-        subprocess.run(["git", "commit", "-m", "child"], check=True, capture_output=True)
+        git("add", "file.txt")
+        git("commit", "-m", "child")
 
         assert git_ops.is_ancestor(parent_sha, "HEAD") is True
 
@@ -216,8 +251,8 @@ class TestIsAncestor:
         parent_sha = result.stdout.strip()
 
         Path("file.txt").write_text("content")
-        subprocess.run(["git", "add", "file.txt"], check=True, capture_output=True)
-        subprocess.run(["git", "commit", "-m", "child"], check=True, capture_output=True)
+        git("add", "file.txt")
+        git("commit", "-m", "child")
 
         assert git_ops.is_ancestor("HEAD", parent_sha) is False
 
@@ -226,6 +261,28 @@ class TestIsAncestor:
         assert git_ops.is_ancestor("HEAD", "HEAD") is True
 
 
+class TestCountDivergence:
+    """Tests for count_divergence."""
+
+    def test_counts_commits_on_each_side(self, temp_git_repo: Path) -> None:
+        """Reports commits behind and ahead of the base."""
+        git_ops.checkout_branch("feature", create=True)
+        for name in ("a.txt", "b.txt"):
+            Path(name).write_text(name)
+            git("add", name)
+            git("commit", "-m", name)
+        git_ops.checkout_branch("main")
+        Path("main.txt").write_text("main")
+        git("add", "main.txt")
+        git("commit", "-m", "main")
+
+        assert git_ops.count_divergence("main", "feature") == (1, 2)
+
+    def test_returns_none_for_unknown_ref(self, temp_git_repo: Path) -> None:
+        """Returns None when a ref doesn't exist."""
+        assert git_ops.count_divergence("main", "nonexistent") is None
+
+
 class TestRebase:
     """Tests for rebase operations."""
 
@@ -233,16 +290,14 @@ class TestRebase:
         """Can rebase one branch onto another."""
         # Create a commit on main
         Path("main_file.txt").write_text("main content")
-        subprocess.run(["git", "add", "main_file.txt"], check=True, capture_output=True)
-        subprocess.run(["git", "commit", "-m", "main commit"], check=True, capture_output=True)
+        git("add", "main_file.txt")
+        git("commit", "-m", "main commit")
 
         # Create feature branch from initial commit and add commit
-        subprocess.run(
-            ["git", "checkout", "-b", "feature", "HEAD~1"], check=True, capture_output=True
-        )
+        git("checkout", "-b", "feature", "HEAD~1")
         Path("feature_file.txt").write_text("feature content")
-        subprocess.run(["git", "add", "feature_file.txt"], check=True, capture_output=True)
-        subprocess.run(["git", "commit", "-m", "feature commit"], check=True, capture_output=True)
+        git("add", "feature_file.txt")
+        git("commit", "-m", "feature commit")
 
         # Rebase feature onto main
         git_ops.rebase("main")
@@ -251,18 +306,34 @@ class TestRebase:
         assert Path("main_file.txt").exists()
         assert Path("feature_file.txt").exists()
 
+    def test_rebase_switches_to_branch(self, temp_git_repo: Path) -> None:
+        """Passing a branch checks it out and rebases it in one call."""
+        git_ops.checkout_branch("feature", create=True)
+        Path("feature_file.txt").write_text("feature content")
+        git("add", "feature_file.txt")
+        git("commit", "-m", "feature commit")
+        git_ops.checkout_branch("main")
+        Path("main_file.txt").write_text("main content")
+        git("add", "main_file.txt")
+        git("commit", "-m", "main commit")
+
+        git_ops.rebase("main", branch="feature")
+
+        assert git_ops.get_current_branch() == "feature"
+        assert git_ops.is_ancestor("main", "feature") is True
+
     def test_rebase_onto(self, temp_git_repo: Path) -> None:
         """Can use rebase --onto for complex rebases."""
         # Create: main -> A -> B, then rebase B onto main (skipping A)
-        subprocess.run(["git", "checkout", "-b", "branch-a"], check=True, capture_output=True)
+        git("checkout", "-b", "branch-a")
         Path("a.txt").write_text("a")
-        subprocess.run(["git", "add", "a.txt"], check=True, capture_output=True)
-        subprocess.run(["git", "commit", "-m", "A"], check=True, capture_output=True)
+        git("add", "a.txt")
+        git("commit", "-m", "A")
 
-        subprocess.run(["git", "checkout", "-b", "branch-b"], check=True, capture_output=True)
+        git("checkout", "-b", "branch-b")
         Path("b.txt").write_text("b")
-        subprocess.run(["git", "add", "b.txt"], check=True, capture_output=True)
-        subprocess.run(["git", "commit", "-m", "B"], check=True, capture_output=True)
+        git("add", "b.txt")
+        git("commit", "-m", "B")
 
         # Rebase B onto main, removing A's changes
         git_ops.rebase("main", onto="main", upstream="branch-a")
@@ -272,6 +343,24 @@ class TestRebase:
         assert not Path("a.txt").exists()
 
 
+@pytest.fixture
+def conflicting_feature(temp_git_repo: Path) -> Path:
+    """temp_git_repo on a 'feature' branch whose only commit conflicts with main's.
+
+    Returns:
+        Path to the repository root.
+    """
+    Path("conflict.txt").write_text("main content")
+    git("add", "conflict.txt")
+    git("commit", "-m", "main")
+
+    git("checkout", "-b", "feature", "HEAD~1")
+    Path("conflict.txt").write_text("feature content")
+    git("add", "conflict.txt")
+    git("commit", "-m", "feature")
+    return temp_git_repo
+
+
 class TestIsRebaseInProgress:
     """Tests for is_rebase_in_progress."""
 
@@ -279,52 +368,24 @@ class TestIsRebaseInProgress:
         """Returns False when no rebase is in progress."""
         assert git_ops.is_rebase_in_progress() is False
 
-    def test_true_during_conflict(self, temp_git_repo: Path) -> None:
+    def test_true_during_conflict(self, conflicting_feature: Path) -> None:
         """Returns True during a rebase with conflicts."""
-        # Create conflicting branches
-        Path("conflict.txt").write_text("main content")
-        subprocess.run(["git", "add", "conflict.txt"], check=True, capture_output=True)
-        subprocess.run(["git", "commit", "-m", "main"], check=True, capture_output=True)
-
-        subprocess.run(
-            ["git", "checkout", "-b", "feature", "HEAD~1"], check=True, capture_output=True
-        )
-        Path("conflict.txt").write_text("feature content")
-        subprocess.run(["git", "add", "conflict.txt"], check=True, capture_output=True)
-        subprocess.run(["git", "commit", "-m", "feature"], check=True, capture_output=True)
-
-        # Start rebase (will conflict)
         result = git_ops.rebase("main", check=False)
 
-        if result.returncode != 0:
-            assert git_ops.is_rebase_in_progress() is True
-            # Cleanup
-            subprocess.run(["git", "rebase", "--abort"], check=True, capture_output=True)
+        assert result.returncode != 0
+        assert git_ops.is_rebase_in_progress() is True
 
 
 class TestRebaseAbort:
     """Tests for rebase_abort."""
 
-    def test_aborts_rebase(self, temp_git_repo: Path) -> None:
+    def test_aborts_rebase(self, conflicting_feature: Path) -> None:
         """Can abort an in-progress rebase."""
-        # Create conflicting branches
-        Path("conflict.txt").write_text("main content")
-        subprocess.run(["git", "add", "conflict.txt"], check=True, capture_output=True)
-        subprocess.run(["git", "commit", "-m", "main"], check=True, capture_output=True)
-
-        subprocess.run(
-            ["git", "checkout", "-b", "feature", "HEAD~1"], check=True, capture_output=True
-        )
-        Path("conflict.txt").write_text("feature content")
-        subprocess.run(["git", "add", "conflict.txt"], check=True, capture_output=True)
-        subprocess.run(["git", "commit", "-m", "feature"], check=True, capture_output=True)
-
-        # Start rebase (will conflict)
         git_ops.rebase("main", check=False)
+        assert git_ops.is_rebase_in_progress() is True
 
-        if git_ops.is_rebase_in_progress():
-            git_ops.rebase_abort()
-            assert git_ops.is_rebase_in_progress() is False
+        git_ops.rebase_abort()
+        assert git_ops.is_rebase_in_progress() is False
 
 
 class TestFetch:
@@ -336,6 +397,23 @@ class TestFetch:
         # Should not raise
 
 
+class TestFetchMany:
+    """Tests for fetch_many."""
+
+    def test_fetches_several_branches(self, temp_git_repo_with_remote: Path) -> None:
+        """Fetches all given branches in one call."""
+        git("push", "origin", "main:other")
+
+        result = git_ops.fetch_many("origin", ["main", "other"])
+
+        assert result.returncode == 0
+
+    def test_noop_for_no_branches(self, temp_git_repo_with_remote: Path) -> None:
+        """Does nothing when no branches are given."""
+        result = git_ops.fetch_many("origin", [])
+        assert result.returncode == 0
+
+
 class TestPush:
     """Tests for push."""
 
@@ -343,18 +421,18 @@ class TestPush:
         """Can push to remote."""
         # Make a commit
         Path("new.txt").write_text("new content")
-        subprocess.run(["git", "add", "new.txt"], check=True, capture_output=True)
-        subprocess.run(["git", "commit", "-m", "new commit"], check=True, capture_output=True)
+        git("add", "new.txt")
+        git("commit", "-m", "new commit")
 
         git_ops.push("origin", "main")
         # Should not raise
 
     def test_push_with_set_upstream(self, temp_git_repo_with_remote: Path) -> None:
         """Can push with -u flag to set upstream."""
-        subprocess.run(["git", "checkout", "-b", "feature"], check=True, capture_output=True)
+        git("checkout", "-b", "feature")
         Path("feature.txt").write_text("feature content")
-        subprocess.run(["git", "add", "feature.txt"], check=True, capture_output=True)
-        subprocess.run(["git", "commit", "-m", "feature"], check=True, capture_output=True)
+        git("add", "feature.txt")
+        git("commit", "-m", "feature")
 
         git_ops.push("origin", "feature", set_upstream=True)
 
@@ -365,6 +443,62 @@ class TestPush:
         assert result.stdout.strip() == "origin"
 
 
+class TestPushBranches:
+    """Tests for push_branches."""
+
+    def test_pushes_all_branches(self, temp_git_repo_with_remote: Path, mocker) -> None:
+        """Pushes every branch with one git push and sets their upstream."""
+        for name in ("feature-a", "feature-b"):
+            git("branch", name)
+        spy = mocker.spy(git_ops, "run_git")
+
+        rejected = git_ops.push_branches("origin", ["feature-a", "feature-b"], set_upstream=True)
+
+        assert rejected == {}
+        assert spy.call_count == 1
+        assert git_ops.get_branch_remotes() == {
+            "main": "origin",
+            "feature-a": "origin",
+            "feature-b": "origin",
+        }
+
+    def test_reports_rejected_branches(self, temp_git_repo_with_remote: Path) -> None:
+        """A rejected branch is reported while the others are still pushed."""
+        git("branch", "feature")
+        # Rewind main so pushing it without force is rejected as non-fast-forward
+        Path("new.txt").write_text("new content")
+        git("add", "new.txt")
+        git("commit", "-m", "new commit")
+        git("push", "origin", "main")
+        git("reset", "--hard", "HEAD~1")
+
+        rejected = git_ops.push_branches("origin", ["main", "feature"], force_with_lease=False)
+
+        assert list(rejected) == ["main"]
+        assert "non-fast-forward" in rejected["main"]
+        assert git_ops.resolve_ref("refs/remotes/origin/feature") is not None
+
+    def test_raises_when_a_branch_has_no_status(self, temp_git_repo: Path, mocker) -> None:
+        """A failed push that doesn't report every branch raises with git's stderr."""
+        mocker.patch.object(
+            git_ops,
+            "run_git",
+            return_value=git_ops.GitResult(
+                stdout="To origin\n!\trefs/heads/a:refs/heads/a\t[rejected] (fetch first)\n",
+                stderr="error: failed to push some refs",
+                returncode=1,
+            ),
+        )
+
+        with pytest.raises(GitError, match="failed to push some refs"):
+            git_ops.push_branches("origin", ["a", "b"])
+
+    def test_raises_when_remote_unreachable(self, temp_git_repo: Path) -> None:
+        """Raises GitError when the push fails as a whole."""
+        with pytest.raises(GitError):
+            git_ops.push_branches("nowhere", ["main"])
+
+
 class TestGetRepoRoot:
     """Tests for get_repo_root."""
 
@@ -373,29 +507,33 @@ class TestGetRepoRoot:
         root = git_ops.get_repo_root()
         assert root == temp_git_repo
 
-    def test_works_from_subdirectory(self, temp_git_repo: Path) -> None:
+    def test_works_from_subdirectory(
+        self, temp_git_repo: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
         """Works when called from a subdirectory."""
-        import os
-
         subdir = temp_git_repo / "subdir"
         subdir.mkdir()
-        os.chdir(subdir)
+        monkeypatch.chdir(subdir)
 
         root = git_ops.get_repo_root()
         assert root == temp_git_repo
 
-    def test_raises_outside_repo(self, tmp_path: Path) -> None:
-        """Raises NotAGitRepoError outside a git repository."""
-        import os
+    def test_caches_result_per_directory(self, temp_git_repo: Path, mocker) -> None:
+        """Repeated calls from the same directory only run git once."""
+        spy = mocker.spy(git_ops, "run_git")
+
+        first = git_ops.get_repo_root()
+        second = git_ops.get_repo_root()
+
+        assert first == second
+        assert spy.call_count == 1
 
-        original_cwd = os.getcwd()
-        os.chdir(tmp_path)
+    def test_raises_outside_repo(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Raises NotAGitRepoError outside a git repository."""
+        monkeypatch.chdir(tmp_path)
 
-        try:
-            with pytest.raises(NotAGitRepoError):
-                git_ops.get_repo_root()
-        finally:
-            os.chdir(original_cwd)
+        with pytest.raises(NotAGitRepoError):
+            git_ops.get_repo_root()
 
 
 class TestSquashCommits:
@@ -404,12 +542,12 @@ class TestSquashCommits:
     def test_squashes_multiple_commits(self, temp_git_repo: Path) -> None:
         """Squashes multiple commits into one."""
         # Create feature branch with multiple commits
-        subprocess.run(["git", "checkout", "-b", "feature"], check=True, capture_output=True)
+        git("checkout", "-b", "feature")
 
         for i in range(3):
             Path(f"file{i}.txt").write_text(f"content {i}")
-            subprocess.run(["git", "add", f"file{i}.txt"], check=True, capture_output=True)
-            subprocess.run(["git", "commit", "-m", f"commit {i}"], check=True, capture_output=True)
+            git("add", f"file{i}.txt")
+            git("commit", "-m", f"commit {i}")
 
         # Count commits before squash
         result = subprocess.run(
@@ -439,10 +577,10 @@ class TestSquashCommits:
 
     def test_noop_for_single_commit(self, temp_git_repo: Path) -> None:
         """Does nothing if there's only one commit."""
-        subprocess.run(["git", "checkout", "-b", "feature"], check=True, capture_output=True)
+        git("checkout", "-b", "feature")
         Path("file.txt").write_text("content")
-        subprocess.run(["git", "add", "file.txt"], check=True, capture_output=True)
-        subprocess.run(["git", "commit", "-m", "single commit"], check=True, capture_output=True)
+        git("add", "file.txt")
+        git("commit", "-m", "single commit")
 
         # Get commit SHA before
         result = subprocess.run(
@@ -464,7 +602,7 @@ class TestSquashCommits:
 
     def test_noop_for_no_commits(self, temp_git_repo: Path) -> None:
         """Does nothing if there are no commits since parent."""
-        subprocess.run(["git", "checkout", "-b", "feature"], check=True, capture_output=True)
+        git("checkout", "-b", "feature")
 
         # Get commit SHA before
         result = subprocess.run(
@@ -486,21 +624,17 @@ class TestSquashCommits:
 
     def test_preserves_first_commit_message(self, temp_git_repo: Path) -> None:
         """Uses the first commit message for the squashed commit."""
-        subprocess.run(["git", "checkout", "-b", "feature"], check=True, capture_output=True)
+        git("checkout", "-b", "feature")
 
         # First commit with meaningful message
         Path("file1.txt").write_text("content 1")
-        subprocess.run(["git", "add", "file1.txt"], check=True, capture_output=True)
-        subprocess.run(
-            ["git", "commit", "-m", "feat: add important feature"],
-            check=True,
-            capture_output=True,
-        )
+        git("add", "file1.txt")
+        git("commit", "-m", "feat: add important feature")
 
         # Second commit
         Path("file2.txt").write_text("content 2")
-        subprocess.run(["git", "add", "file2.txt"], check=True, capture_output=True)
-        subprocess.run(["git", "commit", "-m", "fix: minor fix"], check=True, capture_output=True)
+        git("add", "file2.txt")
+        git("commit", "-m", "fix: minor fix")
 
         git_ops.squash_commits("main")
 
@@ -510,25 +644,165 @@ class TestSquashCommits:
         )
         assert "feat: add important feature" in result.stdout
 
+    def test_uses_first_subject_when_messages_have_bodies(self, temp_git_repo: Path) -> None:
+        """Multi-paragraph messages are split per commit, not across commits."""
+        git("checkout", "-b", "feature")
+        for i in range(2):
+            Path(f"file{i}.txt").write_text(f"content {i}")
+            git("add", f"file{i}.txt")
+            git("commit", "-m", f"subject {i}", "-m", f"body {i}")
+
+        git_ops.squash_commits("main")
+
+        result = subprocess.run(
+            ["git", "log", "-1", "--format=%B"], check=True, capture_output=True, text=True
+        )
+        assert result.stdout.strip() == "subject 0"
+
+    def test_keeps_parent_changes_when_parent_moved(self, temp_git_repo: Path) -> None:
+        """Squashes onto the fork point, not onto the parent's new tip."""
+        git("checkout", "-b", "feature")
+        for i in range(2):
+            Path(f"file{i}.txt").write_text(f"content {i}")
+            git("add", f"file{i}.txt")
+            git("commit", "-m", f"commit {i}")
+        git("checkout", "main")
+        Path("main.txt").write_text("main")
+        git("add", "main.txt")
+        git("commit", "-m", "main")
+        git("checkout", "feature")
+
+        git_ops.squash_commits("main")
+
+        assert git_ops.count_divergence("main", "feature") == (1, 1)
+        git_ops.rebase("main")
+        assert Path("main.txt").exists()
+        assert Path("file0.txt").exists()
+        assert Path("file1.txt").exists()
+
+    def test_squashes_branch_that_is_not_checked_out(self, temp_git_repo: Path) -> None:
+        """A named branch is squashed without switching to it."""
+        git("checkout", "-b", "feature")
+        for i in range(2):
+            Path(f"file{i}.txt").write_text(f"content {i}")
+            git("add", f"file{i}.txt")
+            git("commit", "-m", f"commit {i}")
+        git("checkout", "main")
+
+        git_ops.squash_commits("main", "feature")
+
+        assert git_ops.get_current_branch() == "main"
+        assert git_ops.is_workdir_clean()
+        assert git_ops.count_divergence("main", "feature") == (0, 1)
+        result = subprocess.run(
+            ["git", "ls-tree", "--name-only", "feature"],
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+        assert {"file0.txt", "file1.txt"} <= set(result.stdout.split())
+
+    def test_signs_when_gpgsign_is_set(self, temp_git_repo: Path, mocker) -> None:
+        """Passes -S to commit-tree when commit.gpgsign is enabled."""
+        git("checkout", "-b", "feature")
+        for i in range(2):
+            Path(f"file{i}.txt").write_text(f"content {i}")
+            git("add", f"file{i}.txt")
+            git("commit", "-m", f"commit {i}")
+        git("config", "commit.gpgsign", "true")
+
+        real_run_git = git_ops.run_git
+        commit_tree_calls = []
+
+        def run_git(*args: str, **kwargs):
+            if args[0] == "commit-tree":
+                commit_tree_calls.append(args)
+                # No signing key in the test environment; drop -S before running
+                args = tuple(a for a in args if a != "-S")
+            return real_run_git(*args, **kwargs)
+
+        mocker.patch.object(git_ops, "run_git", side_effect=run_git)
+
+        git_ops.squash_commits("main")
+
+        assert len(commit_tree_calls) == 1
+        assert "-S" in commit_tree_calls[0]
+
+    def test_raises_when_history_is_unrelated(self, temp_git_repo: Path) -> None:
+        """A branch with no fork point from parent raises GitError."""
+        git("checkout", "--orphan", "orphan")
+        for i in range(2):
+            Path(f"file{i}.txt").write_text(f"content {i}")
+            git("add", f"file{i}.txt")
+            git("commit", "-m", f"commit {i}")
+
+        with pytest.raises(GitError, match="does not share history"):
+            git_ops.squash_commits("main")
+
 
 class TestDeleteBranch:
     """Tests for delete_branch."""
 
     def test_deletes_branch(self, temp_git_repo: Path) -> None:
         """Can delete a branch."""
-        subprocess.run(["git", "checkout", "-b", "feature"], check=True, capture_output=True)
-        subprocess.run(["git", "checkout", "main"], check=True, capture_output=True)
+        git("branch", "feature")
 
         git_ops.delete_branch("feature")
         assert git_ops.branch_exists("feature") is False
 
     def test_force_deletes_unmerged_branch(self, temp_git_repo: Path) -> None:
         """Can force delete an unmerged branch."""
-        subprocess.run(["git", "checkout", "-b", "feature"], check=True, capture_output=True)
+        git("checkout", "-b", "feature")
         Path("feature.txt").write_text("content")
-        subprocess.run(["git", "add", "feature.txt"], check=True, capture_output=True)
-        subprocess.run(["git", "commit", "-m", "feature"], check=True, capture_output=True)
-        subprocess.run(["git", "checkout", "main"], check=True, capture_output=True)
+        git("add", "feature.txt")
+        git("commit", "-m", "feature")
+        git("checkout", "main")
 
         git_ops.delete_branch("feature", force=True)
         assert git_ops.branch_exists("feature") is False
+
+
+class TestGetBranchRemotes:
+    """Tests for get_branch_remotes."""
+
+    def test_reads_all_branch_remotes(self, temp_git_repo: Path) -> None:
+        """Returns the remote of every branch that has one, dotted names included."""
+        git("config", "branch.feature.remote", "origin")
+        git("config", "branch.release.v2.remote", "upstream")
+
+        assert git_ops.get_branch_remotes() == {"feature": "origin", "release.v2": "upstream"}
+
+    def test_empty_when_no_upstreams(self, temp_git_repo: Path) -> None:
+        """Returns an empty dict when no branch has a remote configured."""
+        assert git_ops.get_branch_remotes() == {}
+
+
+class TestDeleteBranches:
+    """Tests for delete_branches."""
+
+    def test_deletes_all_in_one_call(self, temp_git_repo: Path, mocker) -> None:
+        """Deletes every branch with a single git process."""
+        for name in ("feature-a", "feature-b"):
+            git("branch", name)
+        spy = mocker.spy(git_ops, "run_git")
+
+        deleted = git_ops.delete_branches(["feature-a", "feature-b"], force=True)
+
+        assert deleted == ["feature-a", "feature-b"]
+        assert spy.call_count == 1
+        assert git_ops.branch_exists("feature-a") is False
+        assert git_ops.branch_exists("feature-b") is False
+
+    def test_reports_branches_it_could_not_delete(self, temp_git_repo: Path) -> None:
+        """A branch that can't be deleted doesn't stop the others."""
+        git("branch", "feature")
+
+        deleted = git_ops.delete_branches(["main", "feature"], force=True)
+
+        assert deleted == ["feature"]
+        assert git_ops.branch_exists("main") is True
+
+    def test_empty_list_runs_nothing(self, mock_subprocess) -> None:
+        """No git process is started for an empty list."""
+        assert git_ops.delete_branches([]) == []
+        mock_subprocess.assert_not_called()
@@ -130,6 +130,16 @@ class TestStackConfig:
 
         assert stack == ["main"]
 
+    def test_get_stack_cycle_raises(self) -> None:
+        """get_stack raises instead of looping on a parent cycle."""
+        config = StackConfig(trunk="main")
+        config.add_branch("a", parent="main")
+        config.add_branch("b", parent="a")
+        config.branches["a"].parent = "b"
+
+        with pytest.raises(ValueError):
+            config.get_stack("b")
+
     def test_get_descendants(self) -> None:
         """get_descendants returns all children recursively."""
         config = StackConfig(trunk="main")
@@ -151,6 +161,69 @@ class TestStackConfig:
 
         assert descendants == []
 
+    def test_get_descendants_parents_first(self) -> None:
+        """get_descendants lists every branch after its parent."""
+        config = StackConfig(trunk="main")
+        config.add_branch("feature", parent="main")
+        config.add_branch("feature-ui", parent="feature")
+        config.add_branch("feature-ui-button", parent="feature-ui")
+        config.add_branch("feature-api", parent="feature")
+
+        descendants = config.get_descendants("main")
+
+        assert descendants == ["feature", "feature-ui", "feature-api", "feature-ui-button"]
+
+    def test_iter_descendants_is_lazy(self) -> None:
+        """iter_descendants yields the same branches as get_descendants."""
+        config = StackConfig(trunk="main")
+        config.add_branch("feature", parent="main")
+        config.add_branch("feature-ui", parent="feature")
+
+        descendants = config.iter_descendants("main")
+
+        assert next(descendants) == "feature"
+        assert list(descendants) == ["feature-ui"]
+
+    def test_root_branches(self) -> None:
+        """root_branches returns branches parented on trunk, in order."""
+        config = StackConfig(trunk="main")
+        config.add_branch("feature", parent="main")
+        config.add_branch("feature-ui", parent="feature")
+        config.add_branch("other", parent="main")
+
+        assert config.root_branches() == ["feature", "other"]
+
+    def test_children(self) -> None:
+        """children returns direct children; trunk's children are the roots."""
+        config = StackConfig(trunk="main")
+        config.add_branch("feature", parent="main")
+        config.add_branch("feature-ui", parent="feature")
+
+        assert config.children("main") == ["feature"]
+        assert config.children("feature") == ["feature-ui"]
+        assert config.children("untracked") == []
+
+    def test_get_full_stack(self) -> None:
+        """get_full_stack returns the branch's whole stack, parents first."""
+        config = StackConfig(trunk="main")
+        config.add_branch("feature", parent="main")
+        config.add_branch("feature-ui", parent="feature")
+        config.add_branch("feature-api", parent="feature")
+        config.add_branch("feature-ui-button", parent="feature-ui")
+        config.add_branch("other", parent="main")
+
+        full_stack = config.get_full_stack("feature-ui")
+
+        assert full_stack == ["feature", "feature-ui", "feature-api", "feature-ui-button"]
+
+    def test_get_full_stack_untracked_is_empty(self) -> None:
+        """get_full_stack returns nothing for trunk or untracked branches."""
+        config = StackConfig(trunk="main")
+        config.add_branch("feature", parent="main")
+
+        assert config.get_full_stack("main") == []
+        assert config.get_full_stack("untracked") == []
+
     def test_topological_sort(self) -> None:
         """Topological sort returns parents before children."""
         config = StackConfig(trunk="main")
@@ -183,6 +256,17 @@ class TestStackConfig:
         # feature must be first, siblings can be in any order after
         assert sorted_branches[0] == "feature"
 
+    def test_topological_sort_untracked_parent(self) -> None:
+        """A branch whose parent is not tracked sorts like a root branch."""
+        config = StackConfig(trunk="main")
+        config.add_branch("orphan-ui", parent="orphan")
+        config.add_branch("orphan", parent="gone")
+        config.add_branch("orphan-ui-button", parent="orphan-ui")
+
+        sorted_branches = config.topological_sort(["orphan-ui-button", "orphan-ui", "orphan"])
+
+        assert sorted_branches == ["orphan", "orphan-ui", "orphan-ui-button"]
+
     def test_isolated_stacks(self) -> None:
         """Branches with different roots are separate stacks."""
         config = StackConfig(trunk="main")
@@ -49,6 +49,56 @@ class TestLoadConfig:
         with pytest.raises(stack_manager.ConfigError):
             stack_manager.load_config(temp_git_repo)
 
+    def test_unsaved_changes_are_not_shared(self, temp_git_repo: Path) -> None:
+        """Mutating a loaded config without saving doesn't affect later loads."""
+        stack_manager.init_config(temp_git_repo, trunk="main")
+
+        stack_manager.load_config(temp_git_repo).add_branch("ghost", "main")
+
+        assert "ghost" not in stack_manager.load_config(temp_git_repo).branches
+
+    def test_changes_after_save_are_not_shared(self, temp_git_repo: Path) -> None:
+        """Mutating a config after saving it doesn't affect later loads."""
+        config = stack_manager.init_config(temp_git_repo, trunk="main")
+        stack_manager.save_config(config, temp_git_repo)
+
+        config.add_branch("ghost", "main")
+
+        assert "ghost" not in stack_manager.load_config(temp_git_repo).branches
+
+    def test_reparses_after_external_write(self, temp_git_repo: Path) -> None:
+        """A config file rewritten behind gstack's back is read again."""
+        stack_manager.init_config(temp_git_repo, trunk="main")
+        stack_manager.load_config(temp_git_repo)
+
+        config_path = temp_git_repo / ".git" / ".gstack_config.json"
+        config_data = {
+            "trunk": "main",
+            "branches": {"feature": {"parent": "main", "children": [], "pr_url": None}},
+        }
+        config_path.write_text(json.dumps(config_data))
+
+        config = stack_manager.load_config(temp_git_repo)
+        assert "feature" in config.branches
+
+
+class TestLoadInitializedConfig:
+    """Tests for loading config while requiring initialization."""
+
+    def test_loads_existing_config(self, temp_git_repo: Path) -> None:
+        """Loads config when gstack is initialized."""
+        stack_manager.init_config(temp_git_repo, trunk="main")
+
+        config = stack_manager.load_initialized_config(temp_git_repo)
+        assert config.trunk == "main"
+
+    def test_raises_when_not_initialized(self, temp_git_repo: Path) -> None:
+        """Raises NotInitializedError if the config file doesn't exist."""
+        from gstack.exceptions import NotInitializedError
+
+        with pytest.raises(NotInitializedError):
+            stack_manager.load_initialized_config(temp_git_repo)
+
 
 class TestSaveConfig:
     """Tests for saving config."""
@@ -90,6 +140,32 @@ class TestSaveConfig:
         assert "new-feature" in loaded.branches
         assert "old-feature" not in loaded.branches
 
+    def test_skips_write_when_unchanged(self, temp_git_repo: Path, mocker) -> None:
+        """Saving an identical config doesn't rewrite the file."""
+        config = StackConfig(trunk="main")
+        config.add_branch("feature", parent="main")
+        stack_manager.save_config(config, temp_git_repo)
+        write = mocker.spy(stack_manager, "_write_atomic")
+
+        stack_manager.save_config(config, temp_git_repo)
+
+        write.assert_not_called()
+
+    def test_failed_write_keeps_existing_config(self, temp_git_repo: Path, mocker) -> None:
+        """A write that fails part way leaves the previous config intact."""
+        config = StackConfig(trunk="main")
+        config.add_branch("feature", parent="main")
+        stack_manager.save_config(config, temp_git_repo)
+        config_path = temp_git_repo / ".git" / ".gstack_config.json"
+        before = config_path.read_text()
+
+        mocker.patch("os.replace", side_effect=OSError("disk full"))
+        config.add_branch("other", parent="main")
+        with pytest.raises(OSError):
+            stack_manager.save_config(config, temp_git_repo)
+
+        assert config_path.read_text() == before
+
 
 class TestInitConfig:
     """Tests for initializing config."""
@@ -227,6 +303,84 @@ class TestSaveState:
         assert loaded == state
 
 
+class TestDiagramHashes:
+    """Tests for the posted stack diagram cache."""
+
+    def test_round_trip(self, temp_git_repo: Path) -> None:
+        """Saved hashes are loaded back."""
+        stack_manager.save_diagram_hashes({"feature": "abc"}, temp_git_repo)
+
+        assert stack_manager.load_diagram_hashes(temp_git_repo) == {"feature": "abc"}
+
+    def test_empty_when_missing(self, temp_git_repo: Path) -> None:
+        """No cache file means nothing has been posted."""
+        assert stack_manager.load_diagram_hashes(temp_git_repo) == {}
+
+    def test_empty_when_corrupt(self, temp_git_repo: Path) -> None:
+        """A corrupt cache is ignored rather than failing submit."""
+        stack_manager.get_diagram_cache_path(temp_git_repo).write_text("{not json")
+
+        assert stack_manager.load_diagram_hashes(temp_git_repo) == {}
+
+
+class TestSaveStateProgress:
+    """Tests for recording sync progress without rewriting the state file."""
+
+    def test_load_applies_logged_progress(self, temp_git_repo: Path) -> None:
+        """load_state picks up the last recorded index."""
+        state = SyncState(active_command="sync", todo_queue=["a", "b", "c"], original_head="a")
+        stack_manager.save_state(state, temp_git_repo)
+        before = (temp_git_repo / ".git" / ".gstack_state.json").read_text()
+
+        for _ in range(2):
+            state.current_index += 1
+            stack_manager.save_state_progress(state, temp_git_repo)
+
+        assert (temp_git_repo / ".git" / ".gstack_state.json").read_text() == before
+        loaded = stack_manager.load_state(temp_git_repo)
+        assert loaded is not None
+        assert loaded.current_index == 2
+
+    def test_ignores_partial_entry(self, temp_git_repo: Path) -> None:
+        """A partially written last entry is ignored."""
+        state = SyncState(active_command="sync", todo_queue=["a", "b"], original_head="a")
+        stack_manager.save_state(state, temp_git_repo)
+        progress_path = temp_git_repo / ".git" / ".gstack_state.progress"
+        progress_path.write_text("1\n2")
+
+        loaded = stack_manager.load_state(temp_git_repo)
+        assert loaded is not None
+        assert loaded.current_index == 1
+
+    def test_ignores_garbled_entry(self, temp_git_repo: Path) -> None:
+        """A complete but non-numeric last entry falls back to the saved index."""
+        state = SyncState(
+            active_command="sync", todo_queue=["a", "b"], current_index=1, original_head="a"
+        )
+        stack_manager.save_state(state, temp_git_repo)
+        progress_path = temp_git_repo / ".git" / ".gstack_state.progress"
+        progress_path.write_text("2\n\x00\x00\n")
+
+        loaded = stack_manager.load_state(temp_git_repo)
+        assert loaded is not None
+        assert loaded.current_index == 1
+
+    def test_save_and_clear_remove_the_log(self, temp_git_repo: Path) -> None:
+        """save_state folds in the log; clear_state removes it."""
+        state = SyncState(active_command="sync", todo_queue=["a", "b"], original_head="a")
+        stack_manager.save_state(state, temp_git_repo)
+        state.current_index = 1
+        stack_manager.save_state_progress(state, temp_git_repo)
+        progress_path = temp_git_repo / ".git" / ".gstack_state.progress"
+
+        stack_manager.save_state(state, temp_git_repo)
+        assert not progress_path.exists()
+
+        stack_manager.save_state_progress(state, temp_git_repo)
+        stack_manager.clear_state(temp_git_repo)
+        assert not progress_path.exists()
+
+
 class TestClearState:
     """Tests for clearing state."""
 
@@ -283,6 +437,21 @@ class TestRegisterBranch:
         config = stack_manager.load_config(temp_git_repo)
         assert "feature-ui" in config.branches["feature"].children
 
+    def test_uses_given_config(self, temp_git_repo: Path, mocker) -> None:
+        """A pre-loaded config is updated in place instead of being reloaded."""
+        config = stack_manager.init_config(temp_git_repo)
+        load = mocker.spy(stack_manager, "load_config")
+
+        returned = stack_manager.register_branch(
+            "feature", parent="main", repo_root=temp_git_repo, config=config
+        )
+
+        assert returned is config
+        assert "feature" in config.branches
+        load.assert_not_called()
+        on_disk = json.loads((temp_git_repo / ".git" / ".gstack_config.json").read_text())
+        assert "feature" in on_disk["branches"]
+
 
 class TestUnregisterBranch:
     """Tests for unregistering a branch."""
@@ -308,3 +477,19 @@ class TestUnregisterBranch:
         config = stack_manager.load_config(temp_git_repo)
         assert "feature" not in config.branches
         assert config.branches["feature-ui"].parent == "main"
+
+    def test_uses_given_config(self, temp_git_repo: Path, mocker) -> None:
+        """A pre-loaded config is updated in place instead of being reloaded."""
+        config = stack_manager.init_config(temp_git_repo)
+        config = stack_manager.register_branch(
+            "feature", parent="main", repo_root=temp_git_repo, config=config
+        )
+        load = mocker.spy(stack_manager, "load_config")
+
+        returned = stack_manager.unregister_branch(
+            "feature", repo_root=temp_git_repo, config=config
+        )
+
+        assert returned is config
+        assert "feature" not in config.branches
+        load.assert_not_called()
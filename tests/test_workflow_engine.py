@@ -23,6 +23,35 @@ def make_commit(message: str = "Test commit") -> str:
     return result.stdout.strip()
 
 
+class TestGetMergedBranches:
+    """Tests for merged branch detection."""
+
+    def test_skips_lookup_without_gh(self, temp_git_repo: Path, mocker) -> None:
+        """Returns no branches without calling gh when it isn't installed."""
+        stack_manager.init_config(temp_git_repo)
+        stack_manager.register_branch("feature", "main", temp_git_repo)
+        mocker.patch("gstack.gh_ops.is_gh_installed", return_value=False)
+        mock_lookup = mocker.patch("gstack.gh_ops.get_all_pr_infos")
+
+        assert workflow_engine.get_merged_branches(temp_git_repo) == []
+        mock_lookup.assert_not_called()
+
+    def test_returns_merged_branches(self, temp_git_repo: Path, mocker) -> None:
+        """Returns tracked branches whose PR is merged."""
+        from gstack.gh_ops import PrInfo
+
+        stack_manager.init_config(temp_git_repo)
+        stack_manager.register_branch("feature", "main", temp_git_repo)
+        stack_manager.register_branch("other", "main", temp_git_repo)
+        mocker.patch("gstack.gh_ops.is_gh_installed", return_value=True)
+        mocker.patch(
+            "gstack.gh_ops.get_all_pr_infos",
+            return_value={"feature": PrInfo(url="u", base="main", state="MERGED", number=1)},
+        )
+
+        assert workflow_engine.get_merged_branches(temp_git_repo) == ["feature"]
+
+
 class TestSyncWorkflow:
     """Tests for sync workflow."""
 
@@ -207,6 +236,33 @@ class TestSyncWorkflow:
         assert "feature-a" in result.rebased_branches
         assert "feature-b" not in result.rebased_branches
 
+    def test_uses_given_config(self, temp_git_repo: Path, mocker) -> None:
+        """A config passed in by the caller is not loaded again."""
+        stack_manager.init_config(temp_git_repo)
+        git_ops.checkout_branch("feature", create=True)
+        make_commit("feature commit")
+        config = stack_manager.register_branch("feature", "main", temp_git_repo)
+        load = mocker.spy(stack_manager, "load_config")
+
+        result = workflow_engine.run_sync(temp_git_repo, config=config)
+
+        assert result.success is True
+        assert result.skipped_branches == ["feature"]
+        load.assert_not_called()
+
+    def test_reports_topo_order(self, temp_git_repo: Path) -> None:
+        """The whole sync queue is reported, parents before children."""
+        stack_manager.init_config(temp_git_repo)
+        for branch, parent in (("feature", "main"), ("feature-ui", "feature")):
+            git_ops.checkout_branch(branch, create=True)
+            make_commit(f"{branch} commit")
+            stack_manager.register_branch(branch, parent, temp_git_repo)
+        git_ops.checkout_branch("feature")
+
+        result = workflow_engine.run_sync(temp_git_repo)
+
+        assert result.topo_order == ["feature", "feature-ui"]
+
 
 class TestContinueWorkflow:
     """Tests for continue workflow."""
@@ -258,6 +314,8 @@ class TestContinueWorkflow:
 
         assert result.success is True
         assert not stack_manager.has_pending_state(temp_git_repo)
+        assert result.rebased_branches == ["feature"]
+        assert result.message.startswith("Successfully rebased 1 branch(es).")
 
 
 class TestAutoSubmitAfterContinue:
@@ -543,6 +601,138 @@ class TestSubmitWorkflow:
         config = stack_manager.load_config(temp_git_repo_with_remote)
         assert config.branches["feature"].pr_url == "https://github.com/test/repo/pull/42"
 
+    def test_submits_whole_stack_in_order(self, temp_git_repo_with_remote: Path, mocker) -> None:
+        """Every branch is pushed and gets a PR; results are reported in stack order."""
+        from gstack.gh_ops import PrCreateResult
+
+        stack_manager.init_config(temp_git_repo_with_remote)
+        for branch, parent in (("feature", "main"), ("feature-ui", "feature")):
+            git_ops.checkout_branch(branch, create=True)
+            make_commit(f"{branch} commit")
+            stack_manager.register_branch(branch, parent, temp_git_repo_with_remote)
+
+        mocker.patch("gstack.gh_ops.is_gh_authenticated", return_value=True)
+        mocker.patch("gstack.gh_ops.get_pr_info", return_value=None)
+        mock_create_pr = mocker.patch(
+            "gstack.gh_ops.create_pr",
+            side_effect=lambda head, base, body: PrCreateResult(
+                url=f"https://github.com/test/repo/pull/{head}", number=1
+            ),
+        )
+
+        result = workflow_engine.run_submit(temp_git_repo_with_remote)
+
+        assert result.success is True
+        assert result.pushed_branches == ["feature", "feature-ui"]
+        assert result.created_prs == ["feature", "feature-ui"]
+        assert mock_create_pr.call_count == 2
+        assert git_ops.get_branch_remotes().keys() >= {"feature", "feature-ui"}
+        config = stack_manager.load_config(temp_git_repo_with_remote)
+        assert (
+            config.branches["feature-ui"].pr_url == "https://github.com/test/repo/pull/feature-ui"
+        )
+
+    def test_posts_diagram_to_every_pr(self, temp_git_repo_with_remote: Path, mocker) -> None:
+        """The same stack diagram is posted to each submitted branch's PR."""
+        from gstack.gh_ops import STACK_COMMENT_MARKER, PrCreateResult
+
+        stack_manager.init_config(temp_git_repo_with_remote)
+        for branch, parent in (("feature", "main"), ("feature-ui", "feature")):
+            git_ops.checkout_branch(branch, create=True)
+            make_commit(f"{branch} commit")
+            stack_manager.register_branch(branch, parent, temp_git_repo_with_remote)
+
+        mocker.patch("gstack.gh_ops.is_gh_authenticated", return_value=True)
+        mocker.patch("gstack.gh_ops.get_pr_info", return_value=None)
+        mocker.patch(
+            "gstack.gh_ops.create_pr",
+            return_value=PrCreateResult(url="https://github.com/test/repo/pull/1", number=1),
+        )
+        mock_comment = mocker.patch(
+            "gstack.gh_ops.add_or_update_stack_comments", return_value=["feature", "feature-ui"]
+        )
+
+        workflow_engine.run_submit(temp_git_repo_with_remote)
+
+        mock_comment.assert_called_once()
+        assert mock_comment.call_args.args[0] == ["feature", "feature-ui"]
+        assert STACK_COMMENT_MARKER in mock_comment.call_args.args[1]
+
+    def test_skips_unchanged_diagram_on_resubmit(
+        self, temp_git_repo_with_remote: Path, mocker
+    ) -> None:
+        """A PR already showing the same diagram isn't posted to again."""
+        from gstack.gh_ops import PrCreateResult
+
+        stack_manager.init_config(temp_git_repo_with_remote)
+        git_ops.checkout_branch("feature", create=True)
+        make_commit("feature commit")
+        stack_manager.register_branch("feature", "main", temp_git_repo_with_remote)
+
+        mocker.patch("gstack.gh_ops.is_gh_authenticated", return_value=True)
+        mocker.patch("gstack.gh_ops.get_pr_info", return_value=None)
+        mocker.patch(
+            "gstack.gh_ops.create_pr",
+            return_value=PrCreateResult(url="https://github.com/test/repo/pull/1", number=1),
+        )
+        mock_comment = mocker.patch(
+            "gstack.gh_ops.add_or_update_stack_comments", return_value=["feature"]
+        )
+
+        workflow_engine.run_submit(temp_git_repo_with_remote)
+        workflow_engine.run_submit(temp_git_repo_with_remote)
+
+        mock_comment.assert_called_once()
+
+    def test_reports_git_reason_for_rejected_push(
+        self, temp_git_repo_with_remote: Path, mocker
+    ) -> None:
+        """A rejected push reports git's reason for the branch."""
+        stack_manager.init_config(temp_git_repo_with_remote)
+        git_ops.checkout_branch("feature", create=True)
+        make_commit("feature commit")
+        stack_manager.register_branch("feature", "main", temp_git_repo_with_remote)
+
+        mocker.patch("gstack.gh_ops.is_gh_authenticated", return_value=True)
+        mocker.patch("gstack.gh_ops.get_pr_info", return_value=None)
+        mocker.patch(
+            "gstack.git_ops.push_branches",
+            side_effect=[{"feature": "[remote rejected] (pre-receive hook declined)"}, {}],
+        )
+
+        result = workflow_engine.run_submit(temp_git_repo_with_remote)
+
+        assert result.success is False
+        assert result.message == (
+            "Failed to push 'feature': [remote rejected] (pre-receive hook declined)"
+        )
+
+    def test_diagram_failure_does_not_fail_submit(
+        self, temp_git_repo_with_remote: Path, mocker
+    ) -> None:
+        """A failed diagram post is not cached and doesn't fail the submit."""
+        from gstack.exceptions import GhError
+        from gstack.gh_ops import PrCreateResult
+
+        stack_manager.init_config(temp_git_repo_with_remote)
+        for branch, parent in (("feature", "main"), ("feature-ui", "feature")):
+            git_ops.checkout_branch(branch, create=True)
+            make_commit(f"{branch} commit")
+            stack_manager.register_branch(branch, parent, temp_git_repo_with_remote)
+
+        mocker.patch("gstack.gh_ops.is_gh_authenticated", return_value=True)
+        mocker.patch("gstack.gh_ops.get_pr_info", return_value=None)
+        mocker.patch(
+            "gstack.gh_ops.create_pr",
+            return_value=PrCreateResult(url="https://github.com/test/repo/pull/1", number=1),
+        )
+        mocker.patch("gstack.gh_ops.add_or_update_stack_comments", side_effect=GhError("boom"))
+
+        result = workflow_engine.run_submit(temp_git_repo_with_remote)
+
+        assert result.success is True
+        assert stack_manager.load_diagram_hashes(temp_git_repo_with_remote) == {}
+
     def test_noop_when_no_branches(self, temp_git_repo: Path, mocker) -> None:
         """No-op when no stacked branches exist."""
         stack_manager.init_config(temp_git_repo)
@@ -631,6 +821,23 @@ class TestPushWorkflow:
         assert result.branch == "feature"
         assert result.pr_created is True
 
+    def test_sets_upstream_on_first_push(self, temp_git_repo_with_remote: Path, mocker) -> None:
+        """A branch without a configured remote gets its upstream set."""
+        stack_manager.init_config(temp_git_repo_with_remote)
+        git_ops.checkout_branch("feature", create=True)
+        make_commit("feature commit")
+        stack_manager.register_branch("feature", "main", temp_git_repo_with_remote)
+
+        mocker.patch("gstack.gh_ops.is_gh_authenticated", return_value=True)
+        mocker.patch("gstack.gh_ops.get_pr_info", return_value=None)
+        mocker.patch("gstack.gh_ops.create_pr", side_effect=Exception("offline"))
+
+        assert "feature" not in git_ops.get_branch_remotes()
+
+        workflow_engine.run_push(temp_git_repo_with_remote)
+
+        assert git_ops.get_branch_remotes()["feature"] == "origin"
+
     def test_creates_pr_if_missing(self, temp_git_repo_with_remote: Path, mocker) -> None:
         """Creates PR if none exists."""
         from gstack.gh_ops import PrCreateResult
@@ -772,6 +979,29 @@ class TestAutoSquashBeforeRebase:
         )
         assert int(result.stdout.strip()) == 1
 
+    def test_sync_squash_keeps_parent_changes(self, temp_git_repo: Path) -> None:
+        """Squashing a branch whose parent moved doesn't drop the parent's commits."""
+        stack_manager.init_config(temp_git_repo)
+        git_ops.checkout_branch("feature", create=True)
+        make_commit("feature commit 1")
+        make_commit("feature commit 2")
+        stack_manager.register_branch("feature", "main", temp_git_repo)
+        git_ops.checkout_branch("main")
+        main_sha = make_commit("main update")
+        git_ops.checkout_branch("feature")
+
+        result = workflow_engine.run_sync(temp_git_repo)
+
+        assert result.success is True
+        assert git_ops.count_divergence("main", "feature") == (0, 1)
+        diff = subprocess.run(
+            ["git", "diff", "--name-status", main_sha, "feature"],
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+        assert all(line.startswith("A") for line in diff.stdout.splitlines())
+
     def test_sync_preserves_single_commit(self, temp_git_repo: Path) -> None:
         """Sync should not modify a branch with only one commit."""
         stack_manager.init_config(temp_git_repo)
@@ -800,6 +1030,47 @@ class TestAutoSquashBeforeRebase:
         # Should still be 1 commit
         assert int(result.stdout.strip()) == 1
 
+    def test_sync_skips_up_to_date_branch(self, temp_git_repo: Path, mocker) -> None:
+        """A single-commit branch already on its parent's tip isn't checked out."""
+        stack_manager.init_config(temp_git_repo)
+        git_ops.checkout_branch("feature", create=True)
+        make_commit("single feature commit")
+        stack_manager.register_branch("feature", "main", temp_git_repo)
+
+        checkout_spy = mocker.spy(git_ops, "checkout_branch")
+        rebase_spy = mocker.spy(git_ops, "rebase")
+
+        result = workflow_engine.run_sync(temp_git_repo)
+
+        assert result.success is True
+        assert result.rebased_branches == []
+        assert result.skipped_branches == ["feature"]
+        assert result.message == "Successfully rebased 0 branch(es). 1 already up to date."
+        rebase_spy.assert_not_called()
+        assert [c.args[0] for c in checkout_spy.call_args_list] == ["feature"]
+
+    def test_sync_rebases_single_commit_branch_without_checkout(
+        self, temp_git_repo: Path, mocker
+    ) -> None:
+        """A branch with nothing to squash is switched to by the rebase itself."""
+        stack_manager.init_config(temp_git_repo)
+        git_ops.checkout_branch("feature", create=True)
+        make_commit("single feature commit")
+        stack_manager.register_branch("feature", "main", temp_git_repo)
+        git_ops.checkout_branch("main")
+        make_commit("main update")
+        git_ops.checkout_branch("feature")
+
+        squash_spy = mocker.spy(git_ops, "squash_commits")
+        checkout_spy = mocker.spy(git_ops, "checkout_branch")
+
+        result = workflow_engine.run_sync(temp_git_repo)
+
+        assert result.success is True
+        assert git_ops.is_ancestor("main", "feature") is True
+        squash_spy.assert_not_called()
+        assert [c.args[0] for c in checkout_spy.call_args_list] == ["feature"]
+
 
 class TestSyncBeforeSubmit:
     """Tests for sync-before-submit behavior (Fix 6)."""
@@ -901,6 +1172,29 @@ class TestSyncBeforeSubmit:
         subprocess.run(["git", "rebase", "--abort"], capture_output=True)
         stack_manager.clear_state(temp_git_repo_with_remote)
 
+    def test_submit_reuses_sync_order(self, temp_git_repo_with_remote: Path, mocker) -> None:
+        """Submit takes its branch list from sync instead of walking the stack again."""
+        from gstack.gh_ops import PrCreateResult
+        from gstack.models import StackConfig
+
+        stack_manager.init_config(temp_git_repo_with_remote)
+        git_ops.checkout_branch("feature", create=True)
+        make_commit("feature commit")
+        stack_manager.register_branch("feature", "main", temp_git_repo_with_remote)
+
+        mocker.patch("gstack.gh_ops.is_gh_authenticated", return_value=True)
+        mocker.patch("gstack.gh_ops.get_pr_info", return_value=None)
+        mocker.patch(
+            "gstack.gh_ops.create_pr",
+            return_value=PrCreateResult(url="https://github.com/test/pr/1", number=1),
+        )
+        full_stack = mocker.spy(StackConfig, "get_full_stack")
+
+        result = workflow_engine.run_submit(temp_git_repo_with_remote)
+
+        assert result.pushed_branches == ["feature"]
+        assert full_stack.call_count == 1
+
 
 class TestPrCreationErrorHandling:
     """Tests for PR creation error handling and logging."""